@@ -18,13 +18,20 @@ SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
 
 import functools
 import operator
+import sys
 import threading
 import typing
 
 __all__ = [
     "current_thread_is_main",
     "dump_to_dict",
+    "dump_many",
     "invariant",
+    "InvariantPolicy",
+    "set_invariant_policy",
+    "reset_invariant_policy",
+    "count_invariants",
+    "invariant_counts",
 ]
 
 
@@ -45,6 +52,15 @@ def current_thread_is_main():
     return threading.current_thread() is threading.main_thread()
 
 
+@functools.lru_cache(maxsize=64)
+def _fields_getter(fields: tuple[str, ...]) -> typing.Callable[[object], tuple]:
+    # attrgetter only returns a tuple with more than one field, so that's evened out here.
+    if len(fields) == 1:
+        get_one = operator.attrgetter(fields[0])
+        return lambda obj: (get_one(obj),)
+    return operator.attrgetter(*fields)
+
+
 def dump_to_dict(obj: object, fields: typing.Sequence) -> typing.Dict[str, typing.Any]:
     """
     Helper function that takes an object and creates a dictionary of the specified fields of that object.
@@ -60,8 +76,44 @@ def dump_to_dict(obj: object, fields: typing.Sequence) -> typing.Dict[str, typin
     d # {'bar': 1}
     ```
     """
-    f = operator.attrgetter(*fields)
-    return dict(zip(fields, f(obj)))
+    fields = tuple(fields)
+    return dict(zip(fields, _fields_getter(fields)(obj)))
+
+
+def _dump_rows(
+    objs: typing.Iterable, fields: tuple[str, ...]
+) -> typing.Iterator[typing.Dict[str, typing.Any]]:
+    getter = _fields_getter(fields)
+    for obj in objs:
+        yield dict(zip(fields, getter(obj)))
+
+
+def dump_many(
+    objs: typing.Iterable, fields: typing.Sequence, layout: str = "rows"
+) -> typing.Iterator[typing.Dict[str, typing.Any]] | typing.Dict[str, list]:
+    """
+    `dump_to_dict` for a lot of objects that share the same fields, looking up the getter only once.
+
+    With `layout="rows"` (the default), this is a generator of one dict per object, so it's safe to use on
+    huge or endless iterables. With `layout="columns"`, returns a single `{field: [values, ...]}` dict instead.
+    ```python
+    list(dump_many(foos, ['bar', 'baz'])) # [{'bar': 1, 'baz': True}, ...]
+    dump_many(foos, ['bar', 'baz'], layout="columns") # {'bar': [1, ...], 'baz': [True, ...]}
+    ```
+    """
+    fields = tuple(fields)
+    if layout == "rows":
+        return _dump_rows(objs, fields)
+    if layout != "columns":
+        raise ValueError(f'layout must be "rows" or "columns", not {layout!r}')
+
+    getter = _fields_getter(fields)
+    columns: tuple[list[typing.Any], ...] = tuple([] for _ in fields)
+    appends = tuple(column.append for column in columns)
+    for obj in objs:
+        for append, value in zip(appends, getter(obj)):
+            append(value)
+    return dict(zip(fields, columns))
 
 
 class InvariantViolation(Exception):
@@ -73,15 +125,123 @@ class InvariantViolation(Exception):
     """
 
 
-# returns True so you can write:
-# `assert invariant(True)`, and it can be ignored in non-debug code
-# Without the assert, invariant will throw a violation in both contexts.
+class InvariantPolicy(object):
+    """
+    How `invariant` checks are run. See `set_invariant_policy`.
+
+    - `ALWAYS`: every call is checked. The default.
+    - `SAMPLED`: 1 in every `sample_every` calls *per call site* is checked; the rest return `True` immediately.
+    - `DISABLED`: nothing is checked, and every call returns `True` immediately.
+    """
+
+    ALWAYS = "always"
+    SAMPLED = "sampled"
+    DISABLED = "disabled"
+
+
+_invariant_policy = (InvariantPolicy.ALWAYS, 1)
+_invariant_module_policies: dict[str, tuple[str, int]] = {}
+_invariant_counting = False
+# call site -> [checks, violations, calls]
+_invariant_sites: dict[tuple[str, int], list[int]] = {}
+_invariant_sites_lock = threading.Lock()
+
+# Precomputed so the common cases skip the frame lookup entirely.
+_invariant_skip_all = False
+_invariant_check_all = True
+
+
+def _refresh_invariant_fast_paths() -> None:
+    global _invariant_skip_all, _invariant_check_all  # pylint: disable=global-statement
+    policies = {_invariant_policy[0]} | {p for p, _ in _invariant_module_policies.values()}
+    _invariant_skip_all = policies == {InvariantPolicy.DISABLED}
+    _invariant_check_all = policies == {InvariantPolicy.ALWAYS} and not _invariant_counting
+
+
+def set_invariant_policy(
+    policy: str, *, sample_every: int = 100, module: str | None = None
+) -> None:
+    """
+    Sets the `InvariantPolicy` for every `invariant` call, or only calls made from the module named `module`
+    (i.e. its `__name__`). Module policies win over the global one.
+
+    ```python
+    set_invariant_policy(InvariantPolicy.SAMPLED, sample_every=1000)
+    set_invariant_policy(InvariantPolicy.ALWAYS, module=__name__)
+    ```
+    """
+    global _invariant_policy  # pylint: disable=global-statement
+    if policy not in (InvariantPolicy.ALWAYS, InvariantPolicy.SAMPLED, InvariantPolicy.DISABLED):
+        raise ValueError(f"Unknown invariant policy {policy!r}")
+    if sample_every < 1:
+        raise ValueError("sample_every must be at least one")
+
+    if module is None:
+        _invariant_policy = (policy, sample_every)
+    else:
+        _invariant_module_policies[module] = (policy, sample_every)
+    _refresh_invariant_fast_paths()
+
+
+def reset_invariant_policy() -> None:
+    """
+    Back to checking every invariant, everywhere, with no module policies.
+    """
+    global _invariant_policy  # pylint: disable=global-statement
+    _invariant_policy = (InvariantPolicy.ALWAYS, 1)
+    _invariant_module_policies.clear()
+    _refresh_invariant_fast_paths()
+
+
+def count_invariants(enabled: bool = True) -> None:
+    """
+    Turns per-call-site counting of checks and violations on or off. See `invariant_counts`.
+
+    Off by default, since it costs a frame lookup on every call.
+    """
+    global _invariant_counting  # pylint: disable=global-statement
+    _invariant_counting = enabled
+    _refresh_invariant_fast_paths()
+
+
+def invariant_counts() -> dict[tuple[str, int], tuple[int, int]]:
+    """
+    `{(file name, line number): (checks, violations)}` for every call site that has been counted.
+
+    Sampled-out calls aren't checks, so they aren't counted as such.
+    This is a snapshot: with other threads still checking, treat the numbers as approximate.
+    """
+    with _invariant_sites_lock:
+        return {
+            site: (checks, violations) for site, (checks, violations, _) in _invariant_sites.items()
+        }
+
+
 @functools.singledispatch
-def invariant(
+def _dispatch_invariant(
     obj: object,
     test: typing.Callable[..., bool],
     msg: str | None = None,
 ) -> bool:
+    if not test(obj):
+        assert callable(test)
+        msg = "" if msg is None else msg[:]
+        raise InvariantViolation(msg)
+    return True
+
+
+@_dispatch_invariant.register(bool)
+def _bool_invariant(condition: bool, msg: str | None = None) -> bool:
+    if not condition:
+        msg = "" if msg is None else msg[:]
+        raise InvariantViolation(msg)
+    return True
+
+
+# returns True so you can write:
+# `assert invariant(True)`, and it can be ignored in non-debug code
+# Without the assert, invariant will throw a violation in both contexts.
+def invariant(obj: object, *args: typing.Any, **kwargs: typing.Any) -> bool:
     """
     Declare an invariant in your code.
 
@@ -90,6 +250,8 @@ def invariant(
     ```
     invariant(True)
     invariant(False) # raises
+    invariant(False, "with a message") # also raises
+    invariant(obj, lambda x: x is not None)
     ```
 
     If prefaced with `assert`, Python will strip it out of your code out of `__debug__`, which may or may not be what you want.
@@ -97,18 +259,50 @@ def invariant(
     If you do preface an `invariant()` call with `assert`, note that the `InvariantViolation` will happen first,
     and you will not see an `AssertionError`.
 
+    Checks can be sampled or switched off, globally or per module, with `set_invariant_policy`.
+    When switched off everywhere, this returns `True` before doing anything else.
+
+    Everything but a plain `bool` goes through `functools.singledispatch`, so `invariant.register`,
+    `invariant.dispatch` and `invariant.registry` work as they would on a singledispatch function.
+    Plain bools skip the dispatch, so registering `bool` has no effect.
+
     Note that typecheckers tend to hate the way that I've defined this. You likely will run into type-checker errors.
     """
-    if not test(obj):
-        assert callable(test)
-        msg = "" if msg is None else msg[:]
-        raise InvariantViolation(msg)
-    return True
+    if _invariant_skip_all:
+        return True
 
+    counters = None
+    if not _invariant_check_all:
+        frame = sys._getframe(1)  # pylint: disable=protected-access
+        policy, sample_every = _invariant_module_policies.get(
+            frame.f_globals.get("__name__", ""), _invariant_policy
+        )
+        if policy == InvariantPolicy.DISABLED:
+            return True
 
-@invariant.register(bool)
-def _(condition: bool, msg: str | None = None) -> bool:
-    if not condition:
-        msg = "" if msg is None else msg[:]
-        raise InvariantViolation(msg)
-    return True
+        if policy == InvariantPolicy.SAMPLED or _invariant_counting:
+            site = (frame.f_code.co_filename, frame.f_lineno)
+            with _invariant_sites_lock:
+                counters = _invariant_sites.get(site)
+                if counters is None:
+                    counters = _invariant_sites[site] = [0, 0, 0]
+                counters[2] += 1
+                if policy == InvariantPolicy.SAMPLED and (counters[2] - 1) % sample_every:
+                    return True
+                counters[0] += 1
+
+    try:
+        # Plain bools are the common case, and don't need dispatching.
+        if type(obj) is bool:
+            return obj or _bool_invariant(obj, *args, **kwargs)
+        return _dispatch_invariant(obj, *args, **kwargs)
+    except InvariantViolation:
+        if counters is not None:
+            with _invariant_sites_lock:
+                counters[1] += 1
+        raise
+
+
+invariant.register = _dispatch_invariant.register  # type: ignore[attr-defined]
+invariant.dispatch = _dispatch_invariant.dispatch  # type: ignore[attr-defined]
+invariant.registry = _dispatch_invariant.registry  # type: ignore[attr-defined]
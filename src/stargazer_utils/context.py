@@ -1,5 +1,5 @@
 """
-Formerly a collection of context managers, but currently only the one.
+Formerly a collection of context managers, but currently only the two.
 Most of the former context managers that could have been here are now part of the stdlib.
 For example, a long time ago, there was a "AbstractContextManager" definition in this file.
 
@@ -9,11 +9,16 @@ SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
 SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
 """
 
+import asyncio
 import signal
-from contextlib import AbstractContextManager
+import threading
+import time
+from concurrent.futures import Executor
+from contextlib import AbstractContextManager, contextmanager
 
 __all__ = [
     "KeyboardInterruptManager",
+    "ShutdownCoordinator",
 ]
 
 
@@ -29,9 +34,11 @@ class KeyboardInterruptManager(AbstractContextManager):
     If you choose to do that, call `super().__exit__(typ, val, tb)` last so that your handler correctly handles the received signal.
     """
 
+    handled_signals: tuple[signal.Signals, ...] = (signal.SIGINT,)
+
     def __init__(self):
         self.signal_received = None
-        self._prev_handler = None
+        self._prev_handlers = {}
         super().__init__()
 
     def signal_handler(self, received_sig, frame):
@@ -39,11 +46,162 @@ class KeyboardInterruptManager(AbstractContextManager):
 
     def __enter__(self):
         self.signal_received = None
-        self._prev_handler = signal.getsignal(signal.SIGINT)
-        signal.signal(signal.SIGINT, self._prev_handler)
+        for sig in self.handled_signals:
+            self._prev_handlers[sig] = signal.getsignal(sig)
+            signal.signal(sig, self.signal_handler)
         return self
 
+    def _restore_handlers(self):
+        for sig, prev_handler in self._prev_handlers.items():
+            signal.signal(sig, prev_handler)
+
     def __exit__(self, typ, val, tb):
-        signal.signal(signal.SIGINT, self._prev_handler)
+        self._restore_handlers()
+
         if self.signal_received:
-            self._prev_handler(*self.signal_received)  # type: ignore
+            received_sig, frame = self.signal_received
+            prev_handler = self._prev_handlers[received_sig]
+            if callable(prev_handler):
+                prev_handler(received_sig, frame)
+            elif prev_handler == signal.SIG_DFL:
+                # Default handling (like terminating on SIGTERM) can only happen by sending it again.
+                signal.raise_signal(received_sig)
+
+
+class ShutdownCoordinator(KeyboardInterruptManager):
+    """
+    A `KeyboardInterruptManager` that also handles SIGTERM, and coordinates a graceful shutdown.
+
+    When a signal arrives (or `request_shutdown` is called), everything watching the coordinator is told:
+    - `shutdown_event` is set, for threads to check or wait on.
+    - the asyncio events from `asyncio_event()` are set, on their own loops.
+
+    When the context exits, in-flight work (anything inside `in_flight()`) gets until `deadline` seconds to finish.
+    After that, whatever's left is cancelled: registered executors are shut down with their queued
+    futures cancelled, and registered asyncio tasks are cancelled.
+    ```python
+    with ShutdownCoordinator(deadline=10) as coordinator:
+        coordinator.add_executor(pool)
+        while not coordinator.shutdown_event.is_set():
+            pool.submit(work, coordinator)
+
+    def work(coordinator):
+        with coordinator.in_flight():
+            ...
+    ```
+
+    Like the parent class, the received signal is passed on to the previous handler once everything is
+    drained, so SIGINT still ends in a `KeyboardInterrupt` and SIGTERM still terminates.
+    Pass `reraise=False` to swallow it instead.
+
+    The previous handlers are put back before draining, so a second Ctrl-C (or SIGTERM) during the drain
+    is handled as usual, rather than waiting out the deadline. Registered work is still cancelled.
+    """
+
+    handled_signals = (signal.SIGINT, signal.SIGTERM)
+
+    def __init__(self, deadline: float = 30.0, *, reraise: bool = True):
+        super().__init__()
+        self.deadline = deadline
+        self.reraise = reraise
+        self.shutdown_event = threading.Event()
+        self._lock = threading.Condition()
+        self._in_flight = 0
+        self._executors: list[Executor] = []
+        self._tasks: list[asyncio.Task] = []
+        self._async_events: list[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    def signal_handler(self, received_sig, frame):
+        super().signal_handler(received_sig, frame)
+        self.request_shutdown()
+
+    def request_shutdown(self) -> None:
+        """
+        Tells everyone to wrap up. Safe to call from any thread, and more than once.
+        """
+        self.shutdown_event.set()
+        with self._lock:
+            async_events = list(self._async_events)
+        for loop, event in async_events:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(event.set)
+
+    @property
+    def shutting_down(self) -> bool:
+        return self.shutdown_event.is_set()
+
+    def asyncio_event(self) -> asyncio.Event:
+        """
+        An `asyncio.Event` for the running loop, set when shutdown is requested.
+        """
+        event = asyncio.Event()
+        with self._lock:
+            self._async_events.append((asyncio.get_running_loop(), event))
+        if self.shutting_down:
+            event.set()
+        return event
+
+    def add_executor(self, executor: Executor) -> None:
+        """
+        Registers a `concurrent.futures.Executor` to be shut down once draining is over.
+        """
+        with self._lock:
+            self._executors.append(executor)
+
+    def add_task(self, task: asyncio.Task) -> None:
+        """
+        Registers an `asyncio.Task` to be cancelled if it's still running once draining is over.
+        """
+        with self._lock:
+            self._tasks.append(task)
+
+    @contextmanager
+    def in_flight(self):
+        """
+        Marks a unit of work that shutdown should wait for.
+        """
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                if not self._in_flight:
+                    self._lock.notify_all()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """
+        Requests shutdown, waits up to `timeout` (default: `deadline`) seconds for in-flight work,
+        then cancels the rest. Returns whether everything finished in time.
+        """
+        self.request_shutdown()
+        give_up_at = time.monotonic() + (self.deadline if timeout is None else timeout)
+        drained = False
+        try:
+            with self._lock:
+                drained = self._lock.wait_for(
+                    lambda: not self._in_flight, timeout=max(0.0, give_up_at - time.monotonic())
+                )
+        finally:
+            # Even if the wait is interrupted (by a second Ctrl-C, say), cancel everything.
+            with self._lock:
+                executors, self._executors = self._executors, []
+                tasks, self._tasks = self._tasks, []
+
+            for executor in executors:
+                executor.shutdown(wait=False, cancel_futures=True)
+            for task in tasks:
+                loop = task.get_loop()
+                if not task.done() and not loop.is_closed():
+                    loop.call_soon_threadsafe(task.cancel)
+        return drained
+
+    def __exit__(self, typ, val, tb):
+        if self.signal_received or self.shutting_down:
+            # The previous handlers go back first, so a second signal isn't swallowed by the drain.
+            self._restore_handlers()
+            self.drain()
+        if not self.reraise:
+            self.signal_received = None
+        super().__exit__(typ, val, tb)
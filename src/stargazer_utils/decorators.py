@@ -1,5 +1,15 @@
 """
-A collection of decorators. Well, just the one right now.
+A collection of decorators. Mostly for calling things that might fail, or that you shouldn't call too often.
+
+- `exponential_retry` retries with a growing delay.
+- `circuit_breaker` stops calling something that keeps failing, and fails fast instead.
+- `rate_limit` throttles calls with a token bucket.
+- `memoize` caches results, with a TTL, size limits, and only one call per missing key at a time.
+- `micro_batch` turns a function that takes a batch into one that takes a single item,
+  and batches up concurrent calls behind the scenes.
+
+`circuit_breaker` and `rate_limit` keep their state per decorated function,
+or per `name`, in which case every function decorated with that name shares it.
 
 ### Legal
 SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
@@ -7,44 +17,817 @@ SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
 SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
 """
 
+import asyncio
 import functools
+import inspect
+import itertools
 import random
+import sys
+import threading
 import time
+import typing
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from .iter import batched
 
 __all__ = [
     "exponential_retry",
+    "circuit_breaker",
+    "rate_limit",
+    "CircuitBreaker",
+    "TokenBucket",
+    "CircuitOpenError",
+    "RateLimitExceeded",
+    "memoize",
+    "CacheInfo",
+    "micro_batch",
 ]
 
+_JITTER_MODES = (None, "full", "decorrelated")
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling a function whose circuit breaker is open.
+
+    `retry_in` is how many seconds until the breaker lets a trial call through.
+    `exponential_retry` never retries this; the point is to fail fast.
+    """
+
+    def __init__(self, msg: str, retry_in: float):
+        super().__init__(msg)
+        self.retry_in = retry_in
+
+
+class RateLimitExceeded(RuntimeError):
+    """
+    Raised by a non-blocking `rate_limit` when there's no token available.
+
+    `retry_in` is how many seconds until there will be. `exponential_retry` never retries this either.
+    """
+
+    def __init__(self, msg: str, retry_in: float):
+        super().__init__(msg)
+        self.retry_in = retry_in
+
+
+_FAIL_FAST = (CircuitOpenError, RateLimitExceeded)
+
+
+def _retry_delays(base_delay, jitter, max_delay):
+    previous = base_delay
+    for attempt in itertools.count(1):
+        ceiling = base_delay**attempt
+        if max_delay is not None:
+            ceiling = min(ceiling, max_delay)
+
+        if jitter == "full":
+            delay = random.uniform(0, ceiling)
+        elif jitter == "decorrelated":
+            delay = random.uniform(base_delay, previous * 3)
+        else:
+            delay = ceiling + random.uniform(0, 1)
+
+        if max_delay is not None:
+            delay = min(delay, max_delay)
+        previous = delay
+        yield delay
+
+
+def _next_delay(ex, delays, retry_after, give_up_at):
+    """
+    How long to sleep before the next try, or `None` if the deadline doesn't leave time for it.
+    """
+    delay = next(delays)
+    if retry_after is not None:
+        hint = retry_after(ex)
+        if hint is not None:
+            delay = max(0.0, hint)
+
+    if give_up_at is not None and time.monotonic() + delay > give_up_at:
+        return None
+    return delay
 
-def exponential_retry(caught_exceptions=None, max_tries=3, base_delay=2):
+
+def exponential_retry(
+    caught_exceptions=None,
+    max_tries=3,
+    base_delay=2,
+    *,
+    jitter=None,
+    max_delay=None,
+    deadline=None,
+    retry_after=None,
+):
     """
     An exponential retry function, intended to consume API ~~or scrape pages~~ where you don't necessarily know the rate limit ahead of time,
     but can be adapted for less surriptitious code as well.
 
     Uses a slight jitter on the delay for... reasons.
+
+    Works on coroutine functions too, in which case it sleeps with `asyncio.sleep` instead of blocking the loop.
+
+    - `jitter`: `None` waits `base_delay**n` plus up to a second. `"full"` waits anywhere from 0 to `base_delay**n`.
+      `"decorrelated"` waits anywhere from `base_delay` to 3 times the previous delay.
+      See [Exponential Backoff And Jitter](https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/).
+    - `max_delay`: caps any single delay.
+    - `deadline`: seconds, from the first call, after which no more retries are started.
+      If the next delay would end past the deadline, the last exception is raised right away.
+    - `retry_after`: called with the caught exception. If it returns a number of seconds, that's used as the
+      delay instead, e.g. for honoring a `Retry-After` header.
+
+    `CircuitOpenError` and `RateLimitExceeded` are never retried.
     """
 
     if caught_exceptions is None:
         caught_exceptions = (Exception,)
+    if jitter not in _JITTER_MODES:
+        raise ValueError(f"jitter must be one of {_JITTER_MODES}")
 
     def deco_retry(f):
+        if inspect.iscoroutinefunction(f):
+
+            @functools.wraps(f)
+            async def f_async_retry(*args, **kwargs):
+                delays = _retry_delays(base_delay, jitter, max_delay)
+                give_up_at = None if deadline is None else time.monotonic() + deadline
+                for _ in range(max_tries - 1):
+                    try:
+                        return await f(*args, **kwargs)
+                    except _FAIL_FAST:
+                        raise
+                    except caught_exceptions as ex:
+                        delay = _next_delay(ex, delays, retry_after, give_up_at)
+                        if delay is None:
+                            raise
+                        await asyncio.sleep(delay)
+
+                # Try last time without a catch.
+                return await f(*args, **kwargs)
+
+            return f_async_retry
+
         @functools.wraps(f)
         def f_retry(*args, **kwargs):
-            tries_left = max_tries - 1
-            delay = base_delay + random.uniform(0, 1)
-            while tries_left > 0:
+            delays = _retry_delays(base_delay, jitter, max_delay)
+            give_up_at = None if deadline is None else time.monotonic() + deadline
+            for _ in range(max_tries - 1):
                 try:
                     return f(*args, **kwargs)
-                except caught_exceptions:
+                except _FAIL_FAST:
+                    raise
+                except caught_exceptions as ex:
+                    delay = _next_delay(ex, delays, retry_after, give_up_at)
+                    if delay is None:
+                        raise
                     time.sleep(delay)
 
-                    tries_left -= 1
-                    expo = max_tries - tries_left
-                    delay = (base_delay**expo) + random.uniform(0, 1)
-
             # Try last time without a catch.
             return f(*args, **kwargs)
 
         return f_retry
 
     return deco_retry
+
+
+class CircuitBreaker(object):
+    """
+    Thread-safe circuit breaker state.
+
+    - **closed**: calls go through. `failure_threshold` failures in a row opens the circuit.
+    - **open**: calls are rejected with `CircuitOpenError`, until `recovery_timeout` seconds have passed.
+    - **half-open**: a single trial call goes through (everything else is still rejected).
+      If it succeeds, the circuit closes. If it fails, the circuit opens again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least one")
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._retry_in() <= 0:
+                return self.HALF_OPEN
+            return self._state
+
+    def _retry_in(self) -> float:
+        return self._opened_at + self.recovery_timeout - time.monotonic()
+
+    def before_call(self) -> None:
+        """
+        Raises `CircuitOpenError` if the call shouldn't happen.
+        """
+        with self._lock:
+            if self._state == self.OPEN:
+                retry_in = self._retry_in()
+                if retry_in > 0:
+                    raise CircuitOpenError("Circuit is open", retry_in)
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+            if self._state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    raise CircuitOpenError("Circuit is half-open and already has a trial call", 0.0)
+                self._trial_in_flight = True
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def on_abandoned(self) -> None:
+        """
+        The call never finished (cancelled, interrupted). Says nothing about health,
+        so just let the next trial call through.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket. Refills at `rate` tokens per second, holding at most `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be at least one token")
+        self.rate = rate
+        self.capacity = max(1.0, rate) if capacity is None else capacity
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Takes `tokens` if they're available and returns 0.
+        Otherwise takes nothing, and returns how many seconds until they will be.
+
+        Asking for more than `capacity` raises `ValueError`, since the bucket can never hold that many.
+        """
+        if tokens > self.capacity:
+            raise ValueError(
+                f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}"
+            )
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+
+_named_state: dict[str, CircuitBreaker | TokenBucket] = {}
+_named_state_lock = threading.Lock()
+
+
+def _shared_state(name, cls, *args):
+    if name is None:
+        return cls(*args)
+
+    with _named_state_lock:
+        state = _named_state.get(name)
+        if state is None:
+            state = _named_state[name] = cls(*args)
+        elif type(state) is not cls:
+            raise ValueError(f"{name!r} is already used by a {type(state).__name__}")
+        return state
+
+
+def circuit_breaker(
+    caught_exceptions=None, failure_threshold=5, recovery_timeout=30.0, *, name=None
+):
+    """
+    Stops calling the decorated function after `failure_threshold` failures in a row
+    (exceptions in `caught_exceptions`), and raises `CircuitOpenError` immediately instead.
+    After `recovery_timeout` seconds, one trial call is let through to see if things are better.
+
+    Other exceptions are re-raised and count as successes; the function *did* respond.
+    Works on coroutine functions too. The `CircuitBreaker` is available as `.circuit`.
+
+    With `name`, every function decorated with the same name shares one breaker.
+    The settings of whichever was decorated first win.
+    """
+
+    if caught_exceptions is None:
+        caught_exceptions = (Exception,)
+
+    def deco_circuit(f):
+        breaker = _shared_state(name, CircuitBreaker, failure_threshold, recovery_timeout)
+
+        if inspect.iscoroutinefunction(f):
+
+            @functools.wraps(f)
+            async def f_async_circuit(*args, **kwargs):
+                breaker.before_call()
+                try:
+                    result = await f(*args, **kwargs)
+                except caught_exceptions:
+                    breaker.on_failure()
+                    raise
+                except Exception:
+                    breaker.on_success()
+                    raise
+                except BaseException:
+                    breaker.on_abandoned()
+                    raise
+                breaker.on_success()
+                return result
+
+            f_async_circuit.circuit = breaker  # type: ignore[attr-defined]
+            return f_async_circuit
+
+        @functools.wraps(f)
+        def f_circuit(*args, **kwargs):
+            breaker.before_call()
+            try:
+                result = f(*args, **kwargs)
+            except caught_exceptions:
+                breaker.on_failure()
+                raise
+            except Exception:
+                breaker.on_success()
+                raise
+            except BaseException:
+                breaker.on_abandoned()
+                raise
+            breaker.on_success()
+            return result
+
+        f_circuit.circuit = breaker  # type: ignore[attr-defined]
+        return f_circuit
+
+    return deco_circuit
+
+
+def rate_limit(rate, capacity=None, *, name=None, block=True):
+    """
+    Limits calls to `rate` per second, with bursts of up to `capacity` (defaults to `rate`).
+
+    With `block`, callers wait for a token (with `asyncio.sleep` for coroutine functions).
+    Without it, they get a `RateLimitExceeded` right away.
+    The `TokenBucket` is available as `.bucket`.
+
+    With `name`, every function decorated with the same name shares one bucket.
+    The settings of whichever was decorated first win.
+    """
+
+    def deco_rate_limit(f):
+        bucket = _shared_state(name, TokenBucket, rate, capacity)
+
+        if inspect.iscoroutinefunction(f):
+
+            @functools.wraps(f)
+            async def f_async_limited(*args, **kwargs):
+                while wait := bucket.try_acquire():
+                    if not block:
+                        raise RateLimitExceeded("Rate limit exceeded", wait)
+                    await asyncio.sleep(wait)
+                return await f(*args, **kwargs)
+
+            f_async_limited.bucket = bucket  # type: ignore[attr-defined]
+            return f_async_limited
+
+        @functools.wraps(f)
+        def f_limited(*args, **kwargs):
+            while wait := bucket.try_acquire():
+                if not block:
+                    raise RateLimitExceeded("Rate limit exceeded", wait)
+                time.sleep(wait)
+            return f(*args, **kwargs)
+
+        f_limited.bucket = bucket  # type: ignore[attr-defined]
+        return f_limited
+
+    return deco_rate_limit
+
+
+class CacheInfo(typing.NamedTuple):
+    """
+    Statistics for a `memoize`d function.
+
+    `coalesced` counts calls that found the key already being computed, and waited for that instead.
+    """
+
+    hits: int
+    misses: int
+    coalesced: int
+    evictions: int
+    expirations: int
+    currsize: int
+    currbytes: int
+
+
+class _Flight(object):
+    """
+    A computation in progress, that other threads can wait on.
+    """
+
+    __slots__ = ("done", "value", "error", "abandoned")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: typing.Any = None
+        self.error: Exception | None = None
+        # Set when the leader left with a `BaseException` (like `SystemExit`), which is its own business.
+        self.abandoned = False
+
+
+_kwd_mark = object()
+_missing = object()
+
+
+class _MemoCache(object):
+    def __init__(self, ttl, maxsize, max_bytes, sizeof):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.lock = threading.Lock()
+        # key -> (value, expires at, size)
+        self.data: OrderedDict[typing.Any, tuple[typing.Any, float | None, int]] = OrderedDict()
+        self.flights: dict[typing.Any, _Flight] = {}
+        self.async_flights: dict[typing.Any, tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self.bytes = 0
+        self.hits = self.misses = self.coalesced = self.evictions = self.expirations = 0
+
+    def lookup(self, key):
+        # Call with the lock held.
+        entry = self.data.get(key)
+        if entry is None:
+            return _missing
+
+        value, expires_at, size = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self.data[key]
+            self.bytes -= size
+            self.expirations += 1
+            return _missing
+
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def store(self, key, value) -> None:
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self.lock:
+            old = self.data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            self.data[key] = (value, expires_at, size)
+            self.bytes += size
+
+            while self.data and (
+                (self.maxsize is not None and len(self.data) > self.maxsize)
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                _, (_, _, evicted_size) = self.data.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def info(self) -> CacheInfo:
+        with self.lock:
+            return CacheInfo(
+                self.hits,
+                self.misses,
+                self.coalesced,
+                self.evictions,
+                self.expirations,
+                len(self.data),
+                self.bytes,
+            )
+
+    def clear(self) -> None:
+        with self.lock:
+            self.data.clear()
+            self.bytes = 0
+
+
+def _make_key(args, kwargs):
+    if not kwargs:
+        return args
+    return args + (_kwd_mark,) + tuple(sorted(kwargs.items()))
+
+
+def _silence_unretrieved(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+def memoize(ttl=None, maxsize=128, max_bytes=None, *, sizeof=sys.getsizeof):
+    """
+    Caches the results of the decorated function, like `functools.lru_cache`, but:
+
+    - `ttl`: entries expire after this many seconds.
+    - `maxsize`: at most this many entries (`None` for no limit). The least recently used go first.
+    - `max_bytes`: at most this many bytes of results, as measured by `sizeof`.
+      The default, `sys.getsizeof`, doesn't look inside containers, so this is an approximation.
+    - If a key is already being computed, other callers wait for that result instead of computing it
+      again. That goes for threads, and for tasks on the same event loop with coroutine functions.
+      Exceptions aren't cached, but everyone waiting on a failed computation gets the exception.
+      If the caller computing a result leaves with a `BaseException` instead (a cancelled task,
+      `SystemExit`, etc.), one of the waiting callers takes over.
+
+    `.cache_info()` returns a `CacheInfo`, and `.cache_clear()` empties the cache.
+    Arguments must be hashable.
+    """
+
+    def deco_memoize(f):
+        cache = _MemoCache(ttl, maxsize, max_bytes, sizeof)
+
+        if inspect.iscoroutinefunction(f):
+
+            @functools.wraps(f)
+            async def f_async_memoized(*args, **kwargs):
+                key = _make_key(args, kwargs)
+                loop = asyncio.get_running_loop()
+                while True:
+                    with cache.lock:
+                        value = cache.lookup(key)
+                        if value is not _missing:
+                            return value
+                        flight = cache.async_flights.get(key)
+                        leader = flight is None or flight[0] is not loop
+                        if leader:
+                            future = loop.create_future()
+                            future.add_done_callback(_silence_unretrieved)
+                            cache.async_flights[key] = (loop, future)
+                            cache.misses += 1
+                        else:
+                            future = flight[1]
+                            cache.coalesced += 1
+
+                    if leader:
+                        break
+                    try:
+                        # Shielded, so a cancelled waiter doesn't cancel everyone else.
+                        return await asyncio.shield(future)
+                    except asyncio.CancelledError:
+                        # If it was the leader that got cancelled, not this task,
+                        # go around again: the first waiter back becomes the new leader.
+                        task = asyncio.current_task()
+                        if not future.cancelled() or (task is not None and task.cancelling()):
+                            raise
+
+                try:
+                    value = await f(*args, **kwargs)
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except BaseException as ex:
+                    future.set_exception(ex)
+                    raise
+                else:
+                    cache.store(key, value)
+                    future.set_result(value)
+                    return value
+                finally:
+                    with cache.lock:
+                        if cache.async_flights.get(key, (None, None))[1] is future:
+                            del cache.async_flights[key]
+
+            f_async_memoized.cache_info = cache.info  # type: ignore[attr-defined]
+            f_async_memoized.cache_clear = cache.clear  # type: ignore[attr-defined]
+            return f_async_memoized
+
+        @functools.wraps(f)
+        def f_memoized(*args, **kwargs):
+            key = _make_key(args, kwargs)
+            while True:
+                with cache.lock:
+                    value = cache.lookup(key)
+                    if value is not _missing:
+                        return value
+                    flight = cache.flights.get(key)
+                    leader = flight is None
+                    if leader:
+                        flight = cache.flights[key] = _Flight()
+                        cache.misses += 1
+                    else:
+                        cache.coalesced += 1
+
+                if leader:
+                    break
+                flight.done.wait()
+                if flight.abandoned:
+                    # Go around again: the first waiter back becomes the new leader.
+                    continue
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value
+
+            try:
+                flight.value = f(*args, **kwargs)
+            except Exception as ex:
+                flight.error = ex
+                raise
+            except BaseException:
+                flight.abandoned = True
+                raise
+            else:
+                cache.store(key, flight.value)
+                return flight.value
+            finally:
+                with cache.lock:
+                    del cache.flights[key]
+                flight.done.set()
+
+        f_memoized.cache_info = cache.info  # type: ignore[attr-defined]
+        f_memoized.cache_clear = cache.clear  # type: ignore[attr-defined]
+        return f_memoized
+
+    return deco_memoize
+
+
+def _checked_results(f, items, results):
+    results = list(results)
+    if len(results) != len(items):
+        raise ValueError(f"{f.__qualname__} returned {len(results)} results for {len(items)} items")
+    return results
+
+
+class _ThreadBatcher(object):
+    """
+    Collects items from any number of threads; a daemon thread calls the batch function.
+    """
+
+    def __init__(self, f, max_size, max_wait):
+        self.f = f
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._ready = threading.Condition()
+        self._pending: list[tuple[typing.Any, Future]] = []
+        self._thread: threading.Thread | None = None
+
+    def submit(self, item):
+        future: Future = Future()
+        with self._ready:
+            self._pending.append((item, future))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"micro_batch-{self.f.__qualname__}", daemon=True
+                )
+                self._thread.start()
+            self._ready.notify()
+        return future.result()
+
+    def _take_batch(self):
+        with self._ready:
+            while not self._pending:
+                self._ready.wait()
+            # The window starts with the first item.
+            give_up_at = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_size:
+                remaining = give_up_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._ready.wait(remaining)
+            taken, self._pending = self._pending, []
+            return taken
+
+    def _dispatch(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = _checked_results(self.f, items, self.f(items))
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            for _, future in batch:
+                future.set_exception(ex)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _run(self):
+        while True:
+            for batch in batched(self._take_batch(), self.max_size):
+                self._dispatch(batch)
+
+
+def _set_async_result(future: asyncio.Future, result) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_async_exception(future: asyncio.Future, ex: BaseException) -> None:
+    if not future.done():
+        future.set_exception(ex)
+
+
+class _AsyncBatcher(object):
+    """
+    Collects items from tasks on an event loop, using a `call_later` timer instead of a thread.
+    Each event loop gets its own pending batch.
+    """
+
+    def __init__(self, f, max_size, max_wait):
+        self.f = f
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._timers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(loop, [])
+        pending.append((item, future))
+
+        if len(pending) >= self.max_size:
+            self._flush(loop)
+        elif loop not in self._timers:
+            self._timers[loop] = loop.call_later(self.max_wait, self._flush, loop)
+        return await future
+
+    def _flush(self, loop):
+        timer = self._timers.pop(loop, None)
+        if timer is not None:
+            timer.cancel()
+        taken = self._pending.pop(loop, [])
+        for batch in batched(taken, self.max_size):
+            task = loop.create_task(self._dispatch(batch))
+            # Hold a reference until it's done, or it could be garbage collected mid-flight.
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = _checked_results(self.f, items, await self.f(items))
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            for _, future in batch:
+                _set_async_exception(future, ex)
+            return
+        for (_, future), result in zip(batch, results):
+            _set_async_result(future, result)
+
+
+def micro_batch(max_size=64, max_wait=0.005):
+    """
+    Decorates a function that takes a list of items and returns a list of results (in the same order),
+    and turns it into a function that takes one item and returns one result.
+    ```python
+    @micro_batch(max_size=100, max_wait=0.01)
+    def lookup(user_ids):
+        return db.fetch_users(user_ids)
+
+    user = lookup(42) # from any number of threads at once.
+    ```
+
+    Calls arriving within `max_wait` seconds of the first pending call (or until `max_size` are pending)
+    are sent through as one batch, split with `iter.batched` if more than `max_size` piled up.
+    If the batch function raises, or returns the wrong number of results, every caller in that batch gets the exception.
+
+    Coroutine functions are batched per event loop, without any threads.
+    Plain functions are called from a background daemon thread.
+    """
+
+    if max_size < 1:
+        raise ValueError("max_size must be at least one")
+
+    def deco_batch(f):
+        if inspect.iscoroutinefunction(f):
+            async_batcher = _AsyncBatcher(f, max_size, max_wait)
+
+            @functools.wraps(f)
+            async def f_async_single(item):
+                return await async_batcher.submit(item)
+
+            return f_async_single
+
+        batcher = _ThreadBatcher(f, max_size, max_wait)
+
+        @functools.wraps(f)
+        def f_single(item):
+            return batcher.submit(item)
+
+        return f_single
+
+    return deco_batch
@@ -25,11 +25,17 @@ __all__ = [
     "read_utf8_json_data",
     "write_utf8_json_data",
     "squish_json",
+    "SQUISHED_SEPARATORS",
 ]
 
 JSON_EXT = "json"
 DOT_JSON = ".json"
 
+SQUISHED_SEPARATORS = (",", ":")
+"""
+The `separators` used by `squish_json`. No whitespace at all.
+"""
+
 
 class JSONIndentConsts(object):
     """
@@ -69,7 +75,7 @@ def squish_json(json_data: dict | list, **kwargs) -> str:
     """
     Formats JSON data to the tightest possible representation in str form.
     """
-    return dumps(json_data, indent=JSONIndentConsts.TIGHT, separators=(",", ":"), **kwargs)
+    return dumps(json_data, indent=JSONIndentConsts.TIGHT, separators=SQUISHED_SEPARATORS, **kwargs)
 
 
 class JSONFileUpdateHandler(AbstractContextManager):
@@ -0,0 +1,232 @@
+"""
+Contains `LatencyHistogram`, a fixed-memory, log-bucketed histogram for latencies in nanoseconds.
+
+It works the same way as an [HDR Histogram](http://hdrhistogram.org/):
+values below `2**precision_bits` get their own bucket, and everything above that is split into
+power-of-two ranges that are each divided into `2**(precision_bits - 1)` linear sub-buckets.
+The relative error of any reported value is therefore bounded by `2**-(precision_bits - 1)`,
+which is under 2% with the defaults.
+```python
+hist = LatencyHistogram()
+with Timer(histogram=hist):
+    do_the_thing()
+hist.p99 # nanoseconds
+```
+
+Histograms with the same configuration can be merged, so the usual pattern is one histogram per
+thread (or process), merged together when you want to look at the numbers.
+For processes, `to_dict` and `from_dict` give you something that survives `json` or `pickle`.
+
+### Legal
+SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
+
+SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
+"""
+
+import math
+import typing
+from array import array
+
+__all__ = [
+    "LatencyHistogram",
+]
+
+_ONE_HOUR_NS = 3_600 * 1_000_000_000
+
+
+class LatencyHistogram(object):
+    """
+    Fixed-memory histogram of non-negative integer values, intended for nanosecond latencies.
+
+    Memory use only depends on `precision_bits` and `highest_trackable`, never on the number of
+    values recorded. Values above `highest_trackable` are counted in the last bucket, but `max` is
+    always exact.
+
+    Recording is **not** locked. Give each thread its own histogram and `merge` them.
+    """
+
+    def __init__(self, *, precision_bits: int = 7, highest_trackable: int = _ONE_HOUR_NS):
+        if precision_bits < 2:
+            raise ValueError("precision_bits must be at least 2")
+        if highest_trackable < 2**precision_bits:
+            raise ValueError("highest_trackable must be at least 2**precision_bits")
+
+        self.precision_bits = precision_bits
+        self.highest_trackable = highest_trackable
+
+        self._linear_limit = 1 << precision_bits
+        self._half = 1 << (precision_bits - 1)
+        self._last_bucket = self._bucket_index(highest_trackable)
+        self.counts = array("Q", bytes(8 * (self._last_bucket + 1)))
+
+        self.count = 0
+        self.total = 0
+        self.min: int | None = None
+        self.max: int | None = None
+
+    def _bucket_index(self, value: int) -> int:
+        if value < self._linear_limit:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        return self._linear_limit + (shift - 1) * self._half + ((value >> shift) - self._half)
+
+    def _bucket_bounds(self, index: int) -> tuple[int, int]:
+        if index < self._linear_limit:
+            return index, index
+        shift, offset = divmod(index - self._linear_limit, self._half)
+        shift += 1
+        lowest = (self._half + offset) << shift
+        return lowest, lowest + (1 << shift) - 1
+
+    def record(self, value: int, count: int = 1) -> None:
+        """
+        Records `value` (nanoseconds, or whatever integer unit you're consistent about) `count` times.
+        """
+        if value < 0:
+            raise ValueError("LatencyHistogram can only record non-negative values")
+        value = int(value)
+
+        index = self._bucket_index(value) if value <= self.highest_trackable else self._last_bucket
+        self.counts[index] += count
+        self.count += count
+        self.total += value * count
+
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def reset(self) -> None:
+        self.counts = array("Q", bytes(8 * len(self.counts)))
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _check_compatible(self, other: "LatencyHistogram") -> None:
+        if (self.precision_bits, self.highest_trackable) != (
+            other.precision_bits,
+            other.highest_trackable,
+        ):
+            raise ValueError("Cannot merge LatencyHistograms with different configurations")
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """
+        Adds the contents of `other` into this histogram, and returns this histogram.
+        """
+        self._check_compatible(other)
+        counts = self.counts
+        for i, c in enumerate(other.counts):
+            if c:
+                counts[i] += c
+
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    __iadd__ = merge
+
+    @classmethod
+    def merged(cls, histograms: typing.Iterable["LatencyHistogram"]) -> "LatencyHistogram":
+        """
+        Returns a new histogram containing all of `histograms`. They must share a configuration.
+        """
+        result: LatencyHistogram | None = None
+        for hist in histograms:
+            if result is None:
+                result = cls(
+                    precision_bits=hist.precision_bits, highest_trackable=hist.highest_trackable
+                )
+            result.merge(hist)
+        return cls() if result is None else result
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> int:
+        """
+        Returns the value at `percent` (0-100), accurate to the bucket resolution.
+
+        Returns 0 for an empty histogram.
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError("percent must be between 0 and 100")
+        if not self.count:
+            return 0
+
+        assert self.min is not None and self.max is not None
+        target = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                lowest, highest = self._bucket_bounds(index)
+                # Middle of the bucket, but never outside of what was actually recorded.
+                return min(max((lowest + highest) // 2, self.min), self.max)
+        return self.max
+
+    @property
+    def p50(self) -> int:
+        return self.percentile(50)
+
+    @property
+    def p90(self) -> int:
+        return self.percentile(90)
+
+    @property
+    def p99(self) -> int:
+        return self.percentile(99)
+
+    @property
+    def p999(self) -> int:
+        return self.percentile(99.9)
+
+    def summary(self) -> dict[str, typing.Any]:
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "p50": self.p50,
+            "p90": self.p90,
+            "p99": self.p99,
+            "p999": self.p999,
+        }
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        """
+        Sparse, JSON-friendly representation, for shipping a histogram between processes.
+        """
+        return {
+            "precision_bits": self.precision_bits,
+            "highest_trackable": self.highest_trackable,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "counts": {str(i): c for i, c in enumerate(self.counts) if c},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, typing.Any]) -> "LatencyHistogram":
+        hist = cls(
+            precision_bits=data["precision_bits"], highest_trackable=data["highest_trackable"]
+        )
+        for index, c in data["counts"].items():
+            hist.counts[int(index)] = c
+        hist.count = data["count"]
+        hist.total = data["total"]
+        hist.min = data["min"]
+        hist.max = data["max"]
+        return hist
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(count={self.count}, min={self.min}, "
+            f"p50={self.p50}, p99={self.p99}, max={self.max})"
+        )
@@ -12,21 +12,67 @@ Inspired in part by [a guy on StackOverflow](https://stackoverflow.com/questions
 
 Turns out, no you don't!
 
+If logging I/O is slowing down the threads doing the logging, pass `non_blocking=True`:
+records are put on a queue and written out in batches by a single background thread.
+```python
+logger = get_logger_for(__file__, non_blocking=True)
+```
+
+If something downstream wants JSON, pass `structured=True` for one compact JSON object per line:
+```python
+logger = get_logger_for(__file__, structured=True)
+```
+
+Log files can be rotated by size and/or age, with old segments gzipped on a background thread:
+```python
+logger = get_logger_for(__file__, log_to_file=True, rotation=LogRotation(max_bytes=2**26, max_segments=10))
+```
+
+Logging in a hot loop? `sample_every` and `rate_limit` thin out records per call site,
+and periodically log how much they threw away:
+```python
+logger = get_logger_for(__file__, rate_limit=10) # At most 10 records per second per line of code.
+```
+
+Calling `get_logger_for` repeatedly is fine; handlers are shared and the loggers are cached.
+
 ### Legal
 SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
 
 SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
 """
 
+import atexit
+import copy
+import glob
+import gzip
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import shutil
 import sys
+import threading
 import time
+import typing
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+from .files.json import SQUISHED_SEPARATORS
 
 __all__ = [
     "get_logger_for",
     "get_short_logger_for",
     "get_debug_logger_for",
+    "dropped_log_records",
+    "JsonFormatter",
+    "LogRotation",
+    "RotatingCompressedFileHandler",
+    "SamplingFilter",
+    "set_log_level",
+    "set_log_format",
 ]
 
 # https://docs.python.org/3.11/library/logging.html#logrecord-attributes
@@ -34,6 +80,580 @@ _default_debug_format = "{name}.{thread:d}.{funcName}.{lineno}.{levelname}-{asct
 _default_prod_format = "{levelname}-{asctime}:\t{message}"
 _default_dt_format = "%Y/%m/%d@%H:%M:%S"
 
+_default_debug_json_fields = (
+    "asctime",
+    "name",
+    "thread",
+    "funcName",
+    "lineno",
+    "levelname",
+    "message",
+)
+_default_prod_json_fields = ("asctime", "levelname", "message")
+_default_json_dt_format = "%Y-%m-%dT%H:%M:%S"
+
+_QUEUE_SIZE = 10_000
+"""
+Size of the queue shared by every `non_blocking` logger.
+"""
+_BATCH_SIZE = 256
+"""
+The background thread flushes after this many records, or whenever it empties the queue.
+"""
+
+_dropped_records = metrics.counter(
+    "stargazer_log_records_dropped_total",
+    "Log records dropped because the non-blocking logging queue was full.",
+)
+
+
+def dropped_log_records() -> int:
+    """
+    How many records `non_blocking` loggers with `drop_on_overflow` have thrown away so far.
+    """
+    return _dropped_records.value
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each record as one compact JSON object, containing only `fields`.
+
+    `fields` are [LogRecord attribute names](https://docs.python.org/3/library/logging.html#logrecord-attributes),
+    plus `message` and `asctime`, which work like they do in a format string.
+    Exception and stack info are added as `exc_info` and `stack_info` whenever present.
+
+    Timestamps are only run through `strftime` once per second, with milliseconds appended.
+    The message is only interpolated here, so records that get filtered out never pay for it.
+    """
+
+    def __init__(self, fields=_default_prod_json_fields, datefmt=_default_json_dt_format):
+        super().__init__(datefmt=datefmt)
+        self.fields = tuple(fields)
+        self._encode = json.JSONEncoder(
+            separators=SQUISHED_SEPARATORS, ensure_ascii=False, default=str
+        ).encode
+        # (second, formatted) as one tuple, so threads never see a mismatched pair.
+        self._last_second: tuple[int, str] = (-1, "")
+
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        cached_second, formatted = self._last_second
+        if second != cached_second:
+            formatted = time.strftime(datefmt or self.datefmt, self.converter(second))
+            self._last_second = (second, formatted)
+        return f"{formatted}.{int(record.msecs):03d}"
+
+    def format(self, record):
+        data = {}
+        for field in self.fields:
+            if field == "message":
+                data[field] = record.getMessage()
+            elif field == "asctime":
+                data[field] = self.formatTime(record, self.datefmt)
+            else:
+                data[field] = getattr(record, field, None)
+
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+        if record.stack_info:
+            data["stack_info"] = self.formatStack(record.stack_info)
+
+        return self._encode(data)
+
+
+def _make_formatter(format_key):
+    structured, spec, date_format = format_key
+    if structured:
+        return JsonFormatter(spec, datefmt=date_format)
+    return logging.Formatter(spec, datefmt=date_format, style="{")
+
+
+class _WriteWithoutFlushMixin(object):
+    """
+    `StreamHandler.emit`, minus the flush. The queue listener flushes once per batch instead.
+    """
+
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handleError(record)
+
+
+class _BatchedStreamHandler(_WriteWithoutFlushMixin, logging.StreamHandler):
+    pass
+
+
+class _BatchedFileHandler(_WriteWithoutFlushMixin, logging.FileHandler):
+    pass
+
+
+class LogRotation(typing.NamedTuple):
+    """
+    When to rotate a log file, and how many old segments to keep.
+
+    - `max_bytes`: rotate once the file is at least this big.
+    - `max_seconds`: rotate once the file is at least this old.
+    - `max_segments`: keep at most this many rotated segments.
+    - `max_total_bytes`: keep at most this many bytes of rotated segments.
+    - `compress`: gzip rotated segments.
+
+    `None` means "no limit". The oldest segments are deleted first.
+    """
+
+    max_bytes: int | None = None
+    max_seconds: float | None = None
+    max_segments: int | None = None
+    max_total_bytes: int | None = None
+    compress: bool = True
+
+
+_compression_executor: ThreadPoolExecutor | None = None
+_compression_executor_lock = threading.Lock()
+
+
+def _get_compression_executor() -> ThreadPoolExecutor:
+    # One worker: segments get compressed in order, and retention never races itself.
+    # The executor finishes any queued work at interpreter exit.
+    global _compression_executor  # pylint: disable=global-statement
+    with _compression_executor_lock:
+        if _compression_executor is None:
+            _compression_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="stargazer-log-rotation"
+            )
+        return _compression_executor
+
+
+def _finish_segment(segment: str, base_file_name: str, rotation: LogRotation) -> None:
+    if rotation.compress:
+        with open(segment, "rb") as source, gzip.open(f"{segment}.gz", "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.remove(segment)
+
+    # Segment names end in a nanosecond timestamp, so sorting by name is sorting by age.
+    segments = sorted(glob.glob(f"{glob.escape(base_file_name)}.*"))
+    sizes = [os.path.getsize(path) for path in segments]
+    total = sum(sizes)
+    while segments and (
+        (rotation.max_segments is not None and len(segments) > rotation.max_segments)
+        or (rotation.max_total_bytes is not None and total > rotation.max_total_bytes)
+    ):
+        os.remove(segments.pop(0))
+        total -= sizes.pop(0)
+
+
+class RotatingCompressedFileHandler(logging.FileHandler):
+    """
+    A `FileHandler` that rotates according to a `LogRotation`.
+
+    Rotating only renames the file (to `<file>.<nanosecond timestamp>`) and opens a new one,
+    which is all the logging thread waits on. Compression and retention happen on a
+    single background thread, or inline once that thread has shut down at interpreter exit.
+    """
+
+    _flush_each_record = True
+
+    def __init__(self, filename, rotation: LogRotation, encoding=None):
+        super().__init__(filename, encoding=encoding)
+        self.rotation = rotation
+        self._size = os.path.getsize(self.baseFilename)
+        self._rollover_at = self._next_rollover_time(time.time())
+
+    def _next_rollover_time(self, now: float) -> float | None:
+        return None if self.rotation.max_seconds is None else now + self.rotation.max_seconds
+
+    def _should_rollover(self, record) -> bool:
+        if self.rotation.max_bytes is not None and self._size >= self.rotation.max_bytes:
+            return True
+        return self._rollover_at is not None and record.created >= self._rollover_at
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            self.stream.write(msg)
+            if self._flush_each_record:
+                self.flush()
+            # Characters rather than bytes, which is close enough to rotate on.
+            self._size += len(msg)
+
+            if self._should_rollover(record):
+                self.rollover()
+        except RecursionError:
+            raise
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handleError(record)
+
+    def rollover(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None  # type: ignore[assignment]
+
+        segment = f"{self.baseFilename}.{time.time_ns()}"
+        os.replace(self.baseFilename, segment)
+        self.stream = self._open()
+        self._size = 0
+        self._rollover_at = self._next_rollover_time(time.time())
+
+        try:
+            _get_compression_executor().submit(
+                _finish_segment, segment, self.baseFilename, self.rotation
+            )
+        except RuntimeError:
+            # The executor is already shut down, which happens when the non-blocking listener
+            # drains at interpreter exit. Nothing is waiting on this thread any more anyway.
+            _finish_segment(segment, self.baseFilename, self.rotation)
+
+
+class _BatchedRotatingFileHandler(RotatingCompressedFileHandler):
+    _flush_each_record = False
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Thins out records per call site (file and line number). Two policies, which can be combined:
+
+    - `every_n`: only 1 in every N records from a call site gets through.
+    - `per_second`: at most N records per call site get through per (wall clock) second.
+
+    Records above `max_level` always get through, since warnings in a hot loop
+    are probably something you want to see.
+
+    Every `summary_interval` seconds (checked as records arrive), if anything was suppressed,
+    a summary record is logged to the logger that suppressed it. Whatever is still unreported
+    is summarized by `flush`, which is also called at interpreter exit, so the tail end
+    of a burst is never lost.
+    """
+
+    def __init__(
+        self,
+        *,
+        every_n: int | None = None,
+        per_second: int | None = None,
+        max_level: int = logging.INFO,
+        summary_interval: float = 60.0,
+    ):
+        super().__init__()
+        if every_n is not None and every_n < 1:
+            raise ValueError("every_n must be at least one")
+        if per_second is not None and per_second < 0:
+            raise ValueError("per_second must not be negative")
+        self.every_n = every_n
+        self.per_second = per_second
+        self.max_level = max_level
+        self.summary_interval = summary_interval
+
+        self._lock = threading.Lock()
+        # call site -> [records seen, current second, records passed this second]
+        self._sites: dict[tuple[str, int], list[int]] = {}
+        self._suppressed: dict[tuple[str, int], int] = {}
+        self._unreported: dict[tuple[str, int], int] = {}
+        self._last_summary = time.time()
+        self._logger_name: str | None = None
+        _sampling_filters.add(self)
+
+    def _keep(self, state: list[int], created: float) -> bool:
+        state[0] += 1
+        if self.every_n is not None and (state[0] - 1) % self.every_n:
+            return False
+
+        if self.per_second is not None:
+            second = int(created)
+            if second != state[1]:
+                state[1], state[2] = second, 0
+            if state[2] >= self.per_second:
+                return False
+            state[2] += 1
+        return True
+
+    def filter(self, record):
+        if record.levelno > self.max_level or getattr(record, "sampling_summary", False):
+            return True
+
+        site = (record.pathname, record.lineno)
+        unreported = None
+        with self._lock:
+            state = self._sites.get(site)
+            if state is None:
+                state = self._sites[site] = [0, -1, 0]
+            keep = self._keep(state, record.created)
+
+            if not keep:
+                self._logger_name = record.name
+                self._suppressed[site] = self._suppressed.get(site, 0) + 1
+                self._unreported[site] = self._unreported.get(site, 0) + 1
+
+            if self._unreported and record.created - self._last_summary >= self.summary_interval:
+                unreported, self._unreported = self._unreported, {}
+                self._last_summary = record.created
+
+        if unreported:
+            self._log_summary(record.name, unreported)
+        return keep
+
+    def flush(self) -> None:
+        """
+        Logs a summary of everything suppressed since the last one, if anything was.
+        """
+        with self._lock:
+            unreported, self._unreported = self._unreported, {}
+            self._last_summary = time.time()
+            logger_name = self._logger_name
+        if unreported and logger_name is not None:
+            self._log_summary(logger_name, unreported)
+
+    def _log_summary(self, logger_name: str, unreported: dict[tuple[str, int], int]) -> None:
+        (path, line), worst = max(unreported.items(), key=lambda item: item[1])
+        logging.getLogger(logger_name).info(
+            "Sampling suppressed %d records from %d call sites. Most from %s:%d (%d).",
+            sum(unreported.values()),
+            len(unreported),
+            os.path.basename(path),
+            line,
+            worst,
+            extra={"sampling_summary": True},
+        )
+
+    def suppressed_counts(self) -> dict[tuple[str, int], int]:
+        """
+        Total records suppressed so far, keyed by `(pathname, lineno)`.
+        """
+        with self._lock:
+            return dict(self._suppressed)
+
+
+_QUEUE_TARGET_TYPES = (_BatchedStreamHandler, _BatchedFileHandler, _BatchedRotatingFileHandler)
+"""
+Handlers only ever written to by the queue listener.
+"""
+
+
+_sampling_filters: "weakref.WeakSet[SamplingFilter]" = weakref.WeakSet()
+
+
+class _DispatchQueueHandler(logging.handlers.QueueHandler):
+    """
+    Puts `(target handlers, record)` on the shared queue, so a single listener can serve every logger.
+    """
+
+    def __init__(self, log_queue, targets, drop_on_overflow=False):
+        super().__init__(log_queue)
+        self.targets = tuple(targets)
+        self.drop_on_overflow = drop_on_overflow
+
+    def prepare(self, record):
+        # Same as the stdlib: merge the args now, since they could be mutated by the time
+        # the listener gets to them. Unlike the stdlib, formatting is left to the listener.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return (self.targets, record)
+
+    def enqueue(self, record):
+        if not self.drop_on_overflow:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped_records.inc()
+
+
+class _BatchingQueueListener(logging.handlers.QueueListener):
+    def __init__(self, log_queue):
+        super().__init__(log_queue, respect_handler_level=True)
+        self._unflushed: set[logging.Handler] = set()
+        self._unflushed_count = 0
+
+    def handle(self, record):
+        handlers, record = record
+        if record is None:
+            # Sent by `close_handlers`: everything queued before this has been written.
+            self.flush()
+            for handler in handlers:
+                handler.close()
+            return
+
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+                self._unflushed.add(handler)
+
+        self._unflushed_count += 1
+        if self._unflushed_count >= _BATCH_SIZE or self.queue.empty():
+            self.flush()
+
+    def flush(self):
+        for handler in self._unflushed:
+            handler.flush()
+        self._unflushed.clear()
+        self._unflushed_count = 0
+
+    def close_handlers(self, handlers):
+        """
+        Closes `handlers` on the listener thread, once the records already queued for them are written.
+        """
+        self.queue.put((tuple(handlers), None))
+
+    def enqueue_sentinel(self):
+        # Block instead of raising queue.Full; the sentinel must not be dropped.
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        super().stop()
+        self.flush()
+
+
+_queue_listener: _BatchingQueueListener | None = None
+_queue_listener_lock = threading.Lock()
+
+
+def _get_queue_listener() -> _BatchingQueueListener:
+    global _queue_listener  # pylint: disable=global-statement
+    with _queue_listener_lock:
+        if _queue_listener is None:
+            _queue_listener = _BatchingQueueListener(queue.Queue(_QUEUE_SIZE))
+            _queue_listener.start()
+        return _queue_listener
+
+
+def _shutdown() -> None:
+    # Summaries first, so they still make it through the listener.
+    for sampling_filter in list(_sampling_filters):
+        sampling_filter.flush()
+    if _queue_listener is not None:
+        _queue_listener.stop()
+
+
+# Registered after `logging` registers its own shutdown, so this runs first.
+atexit.register(_shutdown)
+
+
+class _LoggerRegistry(object):
+    """
+    Bookkeeping that makes `get_logger_for` idempotent.
+
+    - Handlers are shared: every logger that writes to stdout with the same format gets the same handler.
+      Handlers are left at `NOTSET`, so each logger's own level decides what gets through.
+    - Each logger remembers the arguments it was configured with, so calling `get_logger_for`
+      again with the same arguments is a dictionary lookup.
+    - Calling it with *different* arguments swaps the logger's handlers, rather than adding more.
+      Shared handlers that no logger uses any more are closed and forgotten.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._handlers: dict[tuple, logging.Handler] = {}
+        self._configured: dict[str, tuple] = {}
+        self._attached: dict[str, list[logging.Handler]] = {}
+        self._attached_filters: dict[str, list[logging.Filter]] = {}
+
+    def cached_logger(self, logger_name, key):
+        if self._configured.get(logger_name) == key:
+            return logging.getLogger(logger_name)
+        return None
+
+    def shared_handler(self, handler_key, factory):
+        with self._lock:
+            handler = self._handlers.get(handler_key)
+            if handler is None:
+                handler = self._handlers[handler_key] = factory()
+                # Queue handlers format nothing, so they get no formatter.
+                if not isinstance(handler, logging.handlers.QueueHandler):
+                    handler.setFormatter(_make_formatter(handler_key[-1]))
+            return handler
+
+    def configure_logger(self, logger_name, key, handlers, filters, *, level, propagate):
+        with self._lock:
+            logger = logging.getLogger(logger_name)
+            # Report what the old filters suppressed while the old handlers are still attached.
+            for old_filter in self._attached_filters.get(logger_name, []):
+                if isinstance(old_filter, SamplingFilter):
+                    old_filter.flush()
+
+            for handler in self._attached.get(logger_name, []):
+                if handler not in handlers:
+                    logger.removeHandler(handler)
+            for handler in handlers:
+                logger.addHandler(handler)
+
+            for old_filter in self._attached_filters.get(logger_name, []):
+                logger.removeFilter(old_filter)
+            for new_filter in filters:
+                logger.addFilter(new_filter)
+            self._attached_filters[logger_name] = list(filters)
+
+            logger.setLevel(level=level)
+            logger.propagate = propagate
+            self._attached[logger_name] = list(handlers)
+            self._configured[logger_name] = key
+            self._close_unused_handlers()
+            return logger
+
+    def _close_unused_handlers(self):
+        in_use = set()
+        for attached in self._attached.values():
+            for handler in attached:
+                in_use.add(handler)
+                in_use.update(getattr(handler, "targets", ()))
+
+        unused = [key for key, handler in self._handlers.items() if handler not in in_use]
+        queued = []
+        for key in unused:
+            handler = self._handlers.pop(key)
+            if isinstance(handler, _QUEUE_TARGET_TYPES):
+                queued.append(handler)
+            else:
+                handler.close()
+        if queued:
+            # Records for these may still be waiting on the queue.
+            _get_queue_listener().close_handlers(queued)
+
+    def loggers(self):
+        with self._lock:
+            return [logging.getLogger(name) for name in self._configured]
+
+    def text_handlers(self):
+        with self._lock:
+            return [
+                handler
+                for handler in self._handlers.values()
+                if not isinstance(handler, logging.handlers.QueueHandler)
+                and not isinstance(handler.formatter, JsonFormatter)
+            ]
+
+
+_registry = _LoggerRegistry()
+
+
+def set_log_level(level, py_file_name=None):
+    """
+    Changes the level of the logger for `py_file_name`, or of every logger made by `get_logger_for`.
+
+    Takes effect immediately, and sticks: asking for the same logger again won't undo it.
+    """
+    if py_file_name is not None:
+        logging.getLogger(os.path.basename(py_file_name)).setLevel(level)
+        return
+    for logger in _registry.loggers():
+        logger.setLevel(level)
+
+
+def set_log_format(log_format, date_format=None):
+    """
+    Swaps the formatter on every handler made by `get_logger_for`. No handlers are rebuilt.
+
+    Uses `{`-style formatting, same as everything else in here.
+    Handlers of `structured` loggers are left alone; they stay JSON.
+    """
+    _dt_format = _default_dt_format if date_format is None else date_format
+    for handler in _registry.text_handlers():
+        handler.setFormatter(logging.Formatter(log_format, datefmt=_dt_format, style="{"))
+
 
 def get_logger_for(
     py_file_name,
@@ -45,6 +665,13 @@ def get_logger_for(
     log_to_stdout=False,
     propogate=False,
     debug_config=__debug__,
+    non_blocking=False,
+    drop_on_overflow=False,
+    structured=False,
+    json_fields=None,
+    rotation=None,
+    sample_every=None,
+    rate_limit=None,
 ):
     """
     Standardized logger. (I got tired of having to format that thing in every file.)
@@ -56,53 +683,130 @@ def get_logger_for(
     ```
     That's it.
 
+    With `non_blocking`, the logger only puts records on a queue, and a single background thread
+    does the formatting and writing, flushing once per batch rather than once per record.
+    When the queue is full, logging calls wait for room, unless `drop_on_overflow` is also set,
+    in which case the record is dropped and counted (see `dropped_log_records`).
+    Anything still queued is written out at interpreter exit.
+
+    With `structured`, every record is written as one line of compact JSON (see `JsonFormatter`),
+    containing `json_fields`, or a debug/prod default set of fields. `log_format` is ignored.
+
+    With `log_to_file`, `rotation` (a `LogRotation`) rotates the log file by size and/or age.
+    Rotated segments are compressed and pruned on a background thread.
+
+    `sample_every` and `rate_limit` add a `SamplingFilter` to the logger, letting through
+    1 in `sample_every` records, and/or `rate_limit` records per second, per call site.
+    Summaries of what was suppressed are logged as later records arrive, when the filter
+    is replaced by another call, and at interpreter exit.
+
+    Calling this again for the same file is cheap and safe: loggers and handlers are cached,
+    so you won't end up with duplicate handlers (or duplicate log lines).
+    See `set_log_level` and `set_log_format` to change things at runtime.
+
     ### Relevant documentation:
     - [Logging How-To](https://docs.python.org/3/howto/logging.html#logging-advanced-tutorial)
     - [Logging Cookbook](https://docs.python.org/3/howto/logging-cookbook.html)
     - [Logging Tutorial Links](https://docs.python.org/3/howto/logging.html#tutorial-ref-links)
     """
 
+    key = (
+        py_file_name,
+        log_format,
+        date_format,
+        log_to_file,
+        log_to_stdout,
+        propogate,
+        debug_config,
+        non_blocking,
+        drop_on_overflow,
+        structured,
+        json_fields,
+        rotation,
+        sample_every,
+        rate_limit,
+    )
+    logger_name = os.path.basename(py_file_name)
+
+    # Fast path: same logger, same arguments. Nothing to do.
+    logger = _registry.cached_logger(logger_name, key)
+    if logger is not None:
+        return logger
+
     _default_log_format = (
         _default_debug_format if __debug__ and debug_config else _default_prod_format
     )
 
     # https://docs.python.org/3/library/time.html#time.strftime
-    _dt_format = _default_dt_format if date_format is None else date_format[:]
-    _log_format = _default_log_format if log_format is None else log_format[:]
-
-    formatter = logging.Formatter(_log_format, datefmt=_dt_format, style="{")
+    if structured:
+        _dt_format = _default_json_dt_format if date_format is None else date_format[:]
+        _default_fields = (
+            _default_debug_json_fields if __debug__ and debug_config else _default_prod_json_fields
+        )
+        format_key = (
+            True,
+            _default_fields if json_fields is None else tuple(json_fields),
+            _dt_format,
+        )
+    else:
+        _dt_format = _default_dt_format if date_format is None else date_format[:]
+        _log_format = _default_log_format if log_format is None else log_format[:]
+        format_key = (False, _log_format, _dt_format)
     logging_level = logging.DEBUG if __debug__ and debug_config else logging.INFO
 
+    stream_handler_cls = _BatchedStreamHandler if non_blocking else logging.StreamHandler
+    if rotation is not None:
+        rotating_cls = (
+            _BatchedRotatingFileHandler if non_blocking else RotatingCompressedFileHandler
+        )
+        file_handler_cls = lambda file_name: rotating_cls(file_name, rotation)
+    else:
+        file_handler_cls = _BatchedFileHandler if non_blocking else logging.FileHandler
+
     # https://docs.python.org/3/library/logging.html#logging.Logger.addHandler
-    stdout_stream_handler = logging.StreamHandler(sys.stdout)
-    stdout_stream_handler.setLevel(level=logging_level)
-    stdout_stream_handler.setFormatter(formatter)
+    handlers = [
+        _registry.shared_handler(
+            ("stdout", non_blocking, format_key), lambda: stream_handler_cls(sys.stdout)
+        )
+    ]
 
     if log_to_file:
         # Yes, the sgtimer class has this exact functionality
         # but there's no other reason to import the class,
         # So I want to avoid the import to prevent any circular nonsense.
-        logfile_handler = logging.FileHandler(f"{py_file_name}.{int(time.time())}.log")
-        logfile_handler.setLevel(level=logging_level)
-        logfile_handler.setFormatter(formatter)
+        handlers.append(
+            _registry.shared_handler(
+                ("file", py_file_name, non_blocking, rotation, format_key),
+                lambda: file_handler_cls(f"{py_file_name}.{int(time.time())}.log"),
+            )
+        )
 
     # https://docs.python.org/3/library/sys.html?highlight=sys%20stderr#sys.stderr
     if log_to_stdout:
-        stderr_stream_handler = logging.StreamHandler(sys.stderr)
-        stderr_stream_handler.setLevel(level=logging_level)
-        stderr_stream_handler.setFormatter(formatter)
+        handlers.append(
+            _registry.shared_handler(
+                ("stderr", non_blocking, format_key), lambda: stream_handler_cls(sys.stderr)
+            )
+        )
 
-    logger = logging.getLogger(os.path.basename(py_file_name))
-    logger.addHandler(stdout_stream_handler)
-    if log_to_file:
-        logger.addHandler(logfile_handler)
-    if log_to_stdout:
-        logger.addHandler(stderr_stream_handler)
+    if non_blocking:
+        targets = tuple(handlers)
+        handlers = [
+            _registry.shared_handler(
+                ("queue", targets, drop_on_overflow),
+                lambda: _DispatchQueueHandler(
+                    _get_queue_listener().queue, targets, drop_on_overflow=drop_on_overflow
+                ),
+            )
+        ]
 
-    logger.setLevel(level=logging_level)
-    logger.propagate = propogate
+    filters = []
+    if sample_every is not None or rate_limit is not None:
+        filters.append(SamplingFilter(every_n=sample_every, per_second=rate_limit))
 
-    return logger
+    return _registry.configure_logger(
+        logger_name, key, handlers, filters, level=logging_level, propagate=propogate
+    )
 
 
 def get_short_logger_for(py_file_name):
@@ -0,0 +1,445 @@
+"""
+An in-process metrics registry: counters, gauges and timing histograms, with exporters.
+
+Counters and histograms are sharded per thread. Every thread writes to its own shard without
+taking a lock, and the shards are only added together when something reads the metric
+(a "scrape"). Shards of threads that have exited get folded into a single base value on scrape,
+so thread churn doesn't leak memory.
+```python
+json_reads = counter("json_reads_total", "JSON files read.")
+read_time = histogram("json_read_seconds", "Time spent reading JSON files.")
+
+with read_time.time():
+    data = read_utf8_json_data(path)
+json_reads.inc()
+
+exporter = PrometheusFileExporter(REGISTRY, "metrics.prom")
+exporter.start()
+```
+
+Three exporters are included, and each runs on its own daemon thread:
+- `PrometheusFileExporter` writes the Prometheus text format to a file (e.g. for node_exporter's textfile collector).
+- `PrometheusHTTPExporter` serves the Prometheus text format over HTTP on localhost.
+- `StatsdExporter` sends StatsD lines over UDP.
+
+### Relevant documentation:
+- [Prometheus text format](https://prometheus.io/docs/instrumenting/exposition_formats/#text-based-format)
+- [StatsD metric types](https://github.com/statsd/statsd/blob/master/docs/metric_types.md)
+
+### Legal
+SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
+
+SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
+"""
+
+import os
+import re
+import socket
+import threading
+import typing
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from .files import write_utf8_data
+from .histogram import LatencyHistogram
+from .timer import HighResolutionTimer
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "TimingHistogram",
+    "MetricsRegistry",
+    "REGISTRY",
+    "counter",
+    "gauge",
+    "histogram",
+    "PrometheusFileExporter",
+    "PrometheusHTTPExporter",
+    "StatsdExporter",
+]
+
+_METRIC_NAME = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+
+_QUANTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999))
+
+_NS_PER_SECOND = 1_000_000_000
+
+
+class _ThreadSharded(object):
+    """
+    Shared plumbing for metrics that keep one shard per thread.
+
+    Subclasses implement `_new_shard` and `_fold`, which adds a shard into another.
+    """
+
+    def __init__(self, name: str, help_text: str = ""):
+        if not _METRIC_NAME.match(name):
+            raise ValueError(f"{name!r} is not a valid metric name")
+        self.name = name
+        self.help = help_text
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: list[tuple[threading.Thread, typing.Any]] = []
+        self._base = self._new_shard()
+
+    def _new_shard(self):
+        raise NotImplementedError
+
+    def _fold(self, into, shard):
+        raise NotImplementedError
+
+    def _shard(self):
+        # Hot path: a single attribute lookup once the thread has a shard.
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = self._new_shard()
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def _collect(self):
+        with self._lock:
+            alive = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    self._base = self._fold(self._base, shard)
+            self._shards = alive
+            total = self._fold(self._new_shard(), self._base)
+            for _, shard in alive:
+                total = self._fold(total, shard)
+        return total
+
+
+class Counter(_ThreadSharded):
+    """
+    A monotonically increasing count. `inc` is lock-free.
+    """
+
+    kind = "counter"
+
+    def _new_shard(self) -> list[int]:
+        return [0]
+
+    def _fold(self, into: list[int], shard: list[int]) -> list[int]:
+        into[0] += shard[0]
+        return into
+
+    def inc(self, amount: int = 1) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only go up. Use a Gauge.")
+        self._shard()[0] += amount
+
+    @property
+    def value(self) -> int:
+        return self._collect()[0]
+
+
+class TimingHistogram(_ThreadSharded):
+    """
+    A `LatencyHistogram` per thread, merged on scrape. Values are in nanoseconds.
+    """
+
+    kind = "summary"
+
+    def _new_shard(self) -> LatencyHistogram:
+        return LatencyHistogram()
+
+    def _fold(self, into: LatencyHistogram, shard: LatencyHistogram) -> LatencyHistogram:
+        return into.merge(shard)
+
+    def observe_ns(self, value_ns: int) -> None:
+        self._shard().record(value_ns)
+
+    def time(self) -> HighResolutionTimer:
+        """
+        Returns a timer that records into this thread's shard when it stops.
+        ```python
+        with read_time.time():
+            ...
+        ```
+        """
+        return HighResolutionTimer(histogram=self._shard())
+
+    @property
+    def value(self) -> LatencyHistogram:
+        return self._collect()
+
+
+class Gauge(object):
+    """
+    A value that can go up and down.
+
+    Gauges aren't sharded, since a "last value" can't be summed: `set` is a single attribute store,
+    and `inc`/`dec` take a lock. `set_function` makes the gauge call a function on every scrape instead.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str = ""):
+        if not _METRIC_NAME.match(name):
+            raise ValueError(f"{name!r} is not a valid metric name")
+        self.name = name
+        self.help = help_text
+        self._value: float = 0
+        self._function: typing.Callable[[], float] | None = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    def set_function(self, function: typing.Callable[[], float] | None) -> None:
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        return self._value if self._function is None else self._function()
+
+
+Metric = Counter | Gauge | TimingHistogram
+
+
+class MetricsRegistry(object):
+    """
+    A named collection of metrics. Asking for a metric that already exists returns the existing one,
+    so it's safe to declare metrics at the top of every module that uses them.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, help_text: str):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text)
+            elif type(metric) is not cls:
+                raise ValueError(f"{name!r} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str = "") -> TimingHistogram:
+        return self._get_or_create(TimingHistogram, name, help_text)
+
+    def metrics(self) -> list[Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render_prometheus(self) -> str:
+        """
+        Scrapes every metric and renders them in the Prometheus text format.
+
+        Histograms are rendered as summaries, in seconds, since that's the Prometheus base unit.
+        """
+        lines = []
+        for metric in self.metrics():
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+            if isinstance(metric, TimingHistogram):
+                hist = metric.value
+                for _, q in _QUANTILES:
+                    seconds = hist.percentile(q * 100) / _NS_PER_SECOND
+                    lines.append(f'{metric.name}{{quantile="{q}"}} {seconds!r}')
+                lines.append(f"{metric.name}_sum {hist.total / _NS_PER_SECOND!r}")
+                lines.append(f"{metric.name}_count {hist.count}")
+            else:
+                lines.append(f"{metric.name} {metric.value!r}")
+
+        return "".join(f"{line}\n" for line in lines)
+
+
+REGISTRY = MetricsRegistry()
+"""
+The default registry used by `counter`, `gauge` and `histogram`.
+"""
+
+
+def counter(name: str, help_text: str = "") -> Counter:
+    return REGISTRY.counter(name, help_text)
+
+
+def gauge(name: str, help_text: str = "") -> Gauge:
+    return REGISTRY.gauge(name, help_text)
+
+
+def histogram(name: str, help_text: str = "") -> TimingHistogram:
+    return REGISTRY.histogram(name, help_text)
+
+
+class _PeriodicExporter(threading.Thread):
+    """
+    Daemon thread that calls `flush` every `interval` seconds, and once more when stopped.
+
+    Errors other than `OSError` are reported through `threading.excepthook`, and the thread keeps going.
+    """
+
+    def __init__(self, registry: MetricsRegistry, interval: float):
+        super().__init__(name=f"{type(self).__name__}", daemon=True)
+        self.registry = registry
+        self.interval = interval
+        self._stopping = threading.Event()
+
+    def flush(self) -> None:
+        raise NotImplementedError
+
+    def run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            self._safe_flush()
+        self._safe_flush()
+
+    def _safe_flush(self) -> None:
+        # A full disk or a missing StatsD daemon shouldn't kill the exporter thread.
+        try:
+            self.flush()
+        except OSError:
+            pass
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            # Neither should a broken `Gauge.set_function` callback, but that one is worth reporting.
+            threading.excepthook(threading.ExceptHookArgs((type(ex), ex, ex.__traceback__, self)))
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stopping.set()
+        if self.is_alive():
+            self.join(timeout)
+
+
+class PrometheusFileExporter(_PeriodicExporter):
+    """
+    Writes `registry.render_prometheus()` to `file_path` every `interval` seconds.
+
+    The file is written next to the target and then moved over it, so readers never see half a file.
+    """
+
+    def __init__(self, registry: MetricsRegistry, file_path: str, interval: float = 15.0):
+        super().__init__(registry, interval)
+        self.file_path = file_path
+
+    def flush(self) -> None:
+        temp_path = f"{self.file_path}.{os.getpid()}.tmp"
+        write_utf8_data(temp_path, self.registry.render_prometheus())
+        os.replace(temp_path, self.file_path)
+
+
+class StatsdExporter(_PeriodicExporter):
+    """
+    Sends every metric to a StatsD daemon over UDP every `interval` seconds.
+
+    Counters are sent as the increase since the last flush. Negative gauges are sent as a reset to zero
+    followed by the value, since StatsD reads a leading sign as a relative change. Histograms are sent as a counter
+    (`<name>.count`) plus gauges of their quantiles and max in milliseconds (`<name>.p99`, etc.),
+    because the raw samples were never kept.
+    """
+
+    _MAX_PACKET = 1400
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        host: str = "127.0.0.1",
+        port: int = 8125,
+        interval: float = 10.0,
+        prefix: str = "",
+    ):
+        super().__init__(registry, interval)
+        self.address = (host, port)
+        self.prefix = prefix
+        self._last_counts: dict[str, int] = {}
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def _counter_delta(self, name: str, count: int) -> int:
+        delta = count - self._last_counts.get(name, 0)
+        self._last_counts[name] = count
+        return delta
+
+    def lines(self) -> typing.Iterator[str]:
+        for metric in self.registry.metrics():
+            name = f"{self.prefix}{metric.name}"
+            if isinstance(metric, Counter):
+                yield f"{name}:{self._counter_delta(name, metric.value)}|c"
+            elif isinstance(metric, Gauge):
+                value = metric.value
+                if value < 0:
+                    # A leading sign means "adjust by", so zero it first. One line, so one packet.
+                    yield f"{name}:0|g\n{name}:{value}|g"
+                else:
+                    yield f"{name}:{value}|g"
+            else:
+                hist = metric.value
+                yield f"{name}.count:{self._counter_delta(name, hist.count)}|c"
+                if hist.count:
+                    for label, q in _QUANTILES:
+                        yield f"{name}.{label}:{hist.percentile(q * 100) / 1_000_000}|g"
+                    yield f"{name}.max:{(hist.max or 0) / 1_000_000}|g"
+
+    def flush(self) -> None:
+        packet: list[str] = []
+        size = 0
+        for line in self.lines():
+            if packet and size + len(line) + 1 > self._MAX_PACKET:
+                self._socket.sendto("\n".join(packet).encode(), self.address)
+                packet, size = [], 0
+            packet.append(line)
+            size += len(line) + 1
+        if packet:
+            self._socket.sendto("\n".join(packet).encode(), self.address)
+
+    def stop(self, timeout: float | None = None) -> None:
+        super().stop(timeout)
+        self._socket.close()
+
+
+class PrometheusHTTPExporter(object):
+    """
+    Serves `registry.render_prometheus()` over HTTP from a daemon thread. Binds to localhost by default.
+
+    Port 0 picks a free port, which is then available as `.port`.
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int = 9464, host: str = "127.0.0.1"):
+        self.registry = registry
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                pass
+
+        self._server = HTTPServer((host, port), _MetricsHandler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name=type(self).__name__, daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        # shutdown() waits for serve_forever() to notice, which never happens if it never ran.
+        if self._thread.is_alive():
+            self._server.shutdown()
+        self._server.server_close()
@@ -9,6 +9,8 @@ SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
 """
 
 import abc
+import threading
+from array import array
 from json import loads
 from operator import attrgetter
 from typing import Any
@@ -72,29 +74,64 @@ class JsonIOMixin(FromJsonMixin, ToJsonMixin):
 
 
 class _BaseCounterMixin(abc.ABC):
-    @property
-    @abc.abstractmethod
-    def counter(self):
-        raise NotImplementedError
+    """
+    Fibonacci counters, reduced modulo `_modulus`.
+
+    The state is kept reduced too, so every step is the same small-integer addition no matter how long
+    the counter has been running. Advancing is locked, so an instance can be shared between threads.
+    Instances still pickle and copy; the lock is left out, and the copy gets a new one.
+    """
 
+    # Every subclass's outputs must fit in this `array` typecode.
+    _block_typecode = "H"
 
-class DecimalCounterMixin(_BaseCounterMixin):
     def __init__(self):
         self._counter = (1, 2)
+        self._counter_lock = threading.Lock()
 
-    @property
-    def counter(self):
-        a, b = self._counter
-        self._counter = b, a + b
-        return a % 1000
+    def __getstate__(self):
+        # Locks can't be pickled or copied, and a copy deserves its own anyway.
+        state = self.__dict__.copy()
+        state.pop("_counter_lock", None)
+        return state
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._counter_lock = threading.Lock()
 
-class HexCounterMixin(_BaseCounterMixin):
-    def __init__(self):
-        self._counter = (1, 2)
+    @property
+    @abc.abstractmethod
+    def _modulus(self) -> int:
+        raise NotImplementedError
 
     @property
-    def counter(self):
-        a, b = self._counter
-        self._counter = b, a + b
-        return a % 0xFFFF
+    def counter(self) -> int:
+        modulus = self._modulus
+        with self._counter_lock:
+            a, b = self._counter
+            self._counter = b, (a + b) % modulus
+        return a % modulus
+
+    def counter_block(self, n: int) -> array:
+        """
+        The next `n` values of `counter`, taken in one go, as an `array`.
+        """
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        modulus = self._modulus
+        block = array(self._block_typecode, bytes(n * array(self._block_typecode).itemsize))
+        with self._counter_lock:
+            a, b = self._counter
+            for i in range(n):
+                block[i] = a % modulus
+                a, b = b, (a + b) % modulus
+            self._counter = a, b
+        return block
+
+
+class DecimalCounterMixin(_BaseCounterMixin):
+    _modulus = 1000
+
+
+class HexCounterMixin(_BaseCounterMixin):
+    _modulus = 0xFFFF
@@ -0,0 +1,240 @@
+"""
+A small hierarchical span profiler, built on `HighResolutionTimer`.
+
+Spans nest, and every span is aggregated by its full path from the outermost span,
+so you get call counts, total time, and self time (total time minus time spent in child spans)
+for every phase of whatever you're timing.
+```python
+@profile()
+def handle_request():
+    with span("parse"):
+        ...
+    with span("query"):
+        ...
+
+handle_request()
+dump_folded("request.folded") # feed this to flamegraph.pl or speedscope.
+```
+
+The current span is tracked with a `contextvars.ContextVar`, so every thread gets its own tree
+and every asyncio task continues the tree of whatever span was open when the task was created.
+The aggregated statistics are shared, and *are* locked, but only once per span, on exit.
+
+### Relevant documentation:
+- [contextvars](https://docs.python.org/3/library/contextvars.html)
+- [Folded stack format](https://github.com/brendangregg/FlameGraph#2-fold-stacks)
+
+### Legal
+SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
+
+SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
+"""
+
+import functools
+import inspect
+import threading
+from contextlib import AbstractContextManager
+from contextvars import ContextVar
+
+from .files import write_utf8_data
+from .timer import HighResolutionTimer
+
+__all__ = [
+    "SpanStats",
+    "SpanProfiler",
+    "PROFILER",
+    "span",
+    "profile",
+    "dump_folded",
+]
+
+
+class SpanStats(object):
+    """
+    Aggregated timings for every span that shared a single path.
+    """
+
+    __slots__ = ("calls", "total_ns", "child_ns")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.child_ns = 0
+
+    @property
+    def self_ns(self) -> int:
+        # Child spans running concurrently in other tasks can add up to more than the parent.
+        return max(0, self.total_ns - self.child_ns)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(calls={self.calls}, total_ns={self.total_ns}, "
+            f"self_ns={self.self_ns})"
+        )
+
+
+class _Frame(object):
+    __slots__ = ("path", "parent", "timer", "child_ns")
+
+    def __init__(self, path: tuple[str, ...], parent: "_Frame | None"):
+        self.path = path
+        self.parent = parent
+        self.child_ns = 0
+        self.timer = HighResolutionTimer(start_now=True)
+
+
+class _Span(AbstractContextManager):
+    def __init__(self, profiler: "SpanProfiler", name: str):
+        self._profiler = profiler
+        self._name = name
+        self._frame: _Frame | None = None
+        self._token = None
+
+    def __enter__(self):
+        current = self._profiler._current
+        parent = current.get()
+        path = (self._name,) if parent is None else parent.path + (self._name,)
+        self._frame = _Frame(path, parent)
+        self._token = current.set(self._frame)
+        return self
+
+    def __exit__(self, typ, val, tb):
+        frame = self._frame
+        assert frame is not None and self._token is not None
+        frame.timer.stop()
+        elapsed = frame.timer.duration_ns
+        self._profiler._current.reset(self._token)
+
+        if frame.parent is not None:
+            frame.parent.child_ns += elapsed
+        self._profiler._record(frame.path, elapsed, frame.child_ns)
+
+
+class SpanProfiler(object):
+    """
+    Collects nested spans into aggregated `SpanStats`, keyed by the path of span names.
+
+    Most code should just use the module-level `span`, `profile` and `dump_folded`,
+    which all use the shared `PROFILER` instance. Make your own instance if you want
+    a tree that's isolated from everything else.
+    """
+
+    def __init__(self):
+        self._current: ContextVar[_Frame | None] = ContextVar(
+            f"stargazer_span_{id(self)}", default=None
+        )
+        self._lock = threading.Lock()
+        self._stats: dict[tuple[str, ...], SpanStats] = {}
+
+    def _record(self, path: tuple[str, ...], elapsed_ns: int, child_ns: int) -> None:
+        with self._lock:
+            stats = self._stats.get(path)
+            if stats is None:
+                stats = self._stats[path] = SpanStats()
+            stats.calls += 1
+            stats.total_ns += elapsed_ns
+            stats.child_ns += child_ns
+
+    def span(self, name: str) -> _Span:
+        """
+        Returns a context manager that times everything inside it as a child of the current span.
+        """
+        return _Span(self, name)
+
+    def profile(self, name: str | None = None):
+        """
+        Decorator version of `span`. Defaults to the function's qualified name.
+
+        Works on both plain functions and coroutine functions.
+        """
+
+        def deco_profile(f):
+            span_name = f.__qualname__ if name is None else name
+
+            if inspect.iscoroutinefunction(f):
+
+                @functools.wraps(f)
+                async def f_async_profiled(*args, **kwargs):
+                    with _Span(self, span_name):
+                        return await f(*args, **kwargs)
+
+                return f_async_profiled
+
+            @functools.wraps(f)
+            def f_profiled(*args, **kwargs):
+                with _Span(self, span_name):
+                    return f(*args, **kwargs)
+
+            return f_profiled
+
+        return deco_profile
+
+    def stats(self) -> dict[tuple[str, ...], SpanStats]:
+        """
+        A snapshot of the aggregated stats, keyed by span path.
+        """
+        with self._lock:
+            snapshot = {}
+            for path, stats in self._stats.items():
+                copy = snapshot[path] = SpanStats()
+                copy.calls, copy.total_ns, copy.child_ns = (
+                    stats.calls,
+                    stats.total_ns,
+                    stats.child_ns,
+                )
+            return snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+
+    def folded_lines(self):
+        """
+        Yields one `outer;inner;leaf <self time in microseconds>` line per span path.
+        """
+        for path, stats in sorted(self.stats().items()):
+            self_us = stats.self_ns // 1000
+            if self_us:
+                yield f"{';'.join(path)} {self_us}"
+
+    def dump_folded(self, file_path: str) -> int:
+        """
+        Writes the folded stacks to `file_path`, ready for `flamegraph.pl` (or speedscope, etc.).
+        """
+        return write_utf8_data(file_path, "".join(f"{line}\n" for line in self.folded_lines()))
+
+
+PROFILER = SpanProfiler()
+"""
+The shared profiler used by the module-level functions.
+"""
+
+
+def span(name: str) -> AbstractContextManager:
+    """
+    `PROFILER.span`. Used like:
+    ```python
+    with span("load"):
+        ...
+    ```
+    """
+    return PROFILER.span(name)
+
+
+def profile(name: str | None = None):
+    """
+    `PROFILER.profile`. Used like:
+    ```python
+    @profile()
+    def load():
+        ...
+    ```
+    """
+    return PROFILER.profile(name)
+
+
+def dump_folded(file_path: str) -> int:
+    """
+    `PROFILER.dump_folded`.
+    """
+    return PROFILER.dump_folded(file_path)
@@ -13,18 +13,70 @@ Timer also contains some utility methods for timestamps.
 - Timer.get_utc() -> int:
 - Timer.get_utc_string() -> str:
 
+Every completed lap can also be fed straight into a `LatencyHistogram`,
+which is the sane way to get percentiles out of millions of laps:
+```python
+hist = LatencyHistogram()
+t = HighResolutionTimer(histogram=hist)
+```
+
+If you *do* need serious resolution, use `HighResolutionTimer` instead.
+It has the same interface, but is backed by `time.perf_counter_ns` and keeps its timestamps as integer nanoseconds.
+```python
+t = HighResolutionTimer()
+with t:
+    hot_loop()
+t.duration_ns # int
+```
+
+For anything you'd call a benchmark, `bench` handles warmup, loop calibration, GC and statistics:
+```python
+result = bench(functools.partial(parse, payload))
+result.compare_to_baseline("bench.json").regressed
+```
+
+Async code gets `AsyncTimer`, `async_timed` and `EventLoopLagMonitor`, which can tell apart
+time spent waiting on an `await` and time spent blocking the event loop.
+```python
+@async_timed()
+async def handler(request):
+    ...
+handler.timing.cpu_ns # time this coroutine actually held the loop.
+```
+
 ### Legal
 SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
 
 SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
 """
 
+import asyncio
+import functools
+import gc
+import inspect
+import itertools
+import os
+import statistics
 import time
-from contextlib import AbstractContextManager
+import types
+import typing
+from array import array
+from contextlib import AbstractAsyncContextManager, AbstractContextManager
 from datetime import datetime, timedelta, timezone
 
+from .files.json import read_utf8_json_data, write_utf8_json_data
+from .histogram import LatencyHistogram
+
 __all__ = [
     "Timer",
+    "HighResolutionTimer",
+    "BenchResult",
+    "BenchComparison",
+    "bench",
+    "CoroutineTiming",
+    "AsyncTimer",
+    "async_timed",
+    "EventLoopLagMonitor",
 ]
 
 
@@ -95,26 +147,48 @@ class Timer(AbstractContextManager):
     t.stop()
     t.get_laps() # generates 3 laps.
     ```
+
+    ### Recording into a histogram.
+    If a `LatencyHistogram` is passed as `histogram`, the duration of every lap
+    is recorded into it (in nanoseconds) as the lap completes, on `lap()` and `stop()`.
+    The histogram is never reset by the Timer, so it accumulates across restarts.
     """
 
-    def __init__(self, *, start_now: bool = False):
+    def __init__(self, *, start_now: bool = False, histogram: LatencyHistogram | None = None):
         self.start_time: datetime | None = None
         self.stop_time: datetime | None = None
-        self.time_stamps: list[datetime] = []
+        self.time_stamps: list[datetime] = self._new_time_stamps()
+        self.histogram = histogram
 
         if start_now:
-            self.start_time = self.utcnow()
+            self.start_time = self._now()
             self.time_stamps.append(self.start_time)
 
+    # The two hooks below are what subclasses override to change the clock and storage.
+    def _now(self):
+        return self.utcnow()
+
+    def _new_time_stamps(self):
+        return []
+
+    @staticmethod
+    def _elapsed_ns(start, end) -> int:
+        return (end - start) // timedelta(microseconds=1) * 1000
+
+    def _record_last_lap(self) -> None:
+        stamps = self.time_stamps
+        if self.histogram is not None and len(stamps) > 1:
+            self.histogram.record(self._elapsed_ns(stamps[-2], stamps[-1]))
+
     def reset(self) -> None:
         self.start_time = None
         self.stop_time = None
-        self.time_stamps = []
+        self.time_stamps = self._new_time_stamps()
 
     def start(self) -> None:
         # Have we started?
         if self.start_time is None:
-            self.start_time = self.utcnow()
+            self.start_time = self._now()
             self.time_stamps.append(self.start_time)
             return
 
@@ -122,9 +196,9 @@ class Timer(AbstractContextManager):
         # Implicit self.start_time is not None here.
         if self.stop_time is not None:
             self.stop_time = None
-            self.time_stamps = []
+            self.time_stamps = self._new_time_stamps()
 
-            self.start_time = self.utcnow()
+            self.start_time = self._now()
             self.time_stamps.append(self.start_time)
             return
 
@@ -142,8 +216,9 @@ class Timer(AbstractContextManager):
             if old is not None:
                 raise TimerError("Timer.stop() called on Timer instance that was already stopped")
 
-        self.stop_time = self.utcnow()
+        self.stop_time = self._now()
         self.time_stamps.append(self.stop_time)
+        self._record_last_lap()
 
     @property
     def duration_as_delta(self) -> timedelta:
@@ -161,14 +236,14 @@ class Timer(AbstractContextManager):
     duration = duration_in_seconds
 
     def lap(self) -> None:
-        self.time_stamps.append(self.utcnow())
+        self.time_stamps.append(self._now())
         if __debug__ and not self.start_time:
             raise TimerError("Timer.lap() called before timer instance was started.")
+        self._record_last_lap()
 
     def get_laps(self):
-        if self.lap_count > 1:
-            for i in range(self.lap_count - 1):
-                yield (self.time_stamps[i], self.time_stamps[i + 1])
+        for i in range(self.lap_count):
+            yield (self.time_stamps[i], self.time_stamps[i + 1])
 
     @property
     def lap_count(self) -> int:
@@ -196,3 +271,459 @@ class Timer(AbstractContextManager):
     @classmethod
     def get_utc_string(cls) -> str:
         return str(cls.get_utc())
+
+
+class HighResolutionTimer(Timer):
+    """
+    Timer backed by `time.perf_counter_ns`, for when you actually care about microseconds.
+
+    Every timestamp (including `start_time` and `stop_time`) is an integer count of nanoseconds
+    from an arbitrary point, and laps are stored in an `array('q')` rather than a list of datetimes,
+    so `lap()` doesn't allocate anything beyond the occasional array resize.
+
+    Durations are available as exact nanoseconds with `duration_ns` and `lap_times_ns()`.
+    The `timedelta`-based interface of `Timer` still works, but is only converted at report time.
+
+    Wall-clock times are *derived*, not measured: the timer remembers the offset between
+    `time.time_ns` and `time.perf_counter_ns` when it starts, and `wall_clock_stamps()` applies it.
+    ```python
+    t = HighResolutionTimer(start_now=True)
+    for item in items:
+        work(item)
+        t.lap()
+    t.stop()
+    worst = max(t.lap_times_ns())
+    ```
+    """
+
+    # Nanosecond ints rather than the datetimes of `Timer`.
+    start_time: int | None  # type: ignore[assignment]
+    stop_time: int | None  # type: ignore[assignment]
+
+    def __init__(self, *, start_now: bool = False, histogram: LatencyHistogram | None = None):
+        self._wall_offset_ns = 0
+        super().__init__(start_now=start_now, histogram=histogram)
+
+    def _now(self) -> int:
+        return time.perf_counter_ns()
+
+    def _new_time_stamps(self) -> array:
+        # Resetting the anchor here means it's refreshed on every (re)start.
+        self._wall_offset_ns = time.time_ns() - time.perf_counter_ns()
+        return array("q")
+
+    @staticmethod
+    def _elapsed_ns(start, end) -> int:
+        return end - start
+
+    @property
+    def duration_ns(self) -> int:
+        if self.start_time is None:
+            raise RuntimeError(".duration_ns accessed without a start time.")
+
+        end = self.stop_time if self.stop_time is not None else self._now()
+        return end - self.start_time
+
+    @property
+    def duration_as_delta(self) -> timedelta:
+        return timedelta(microseconds=self.duration_ns / 1000)
+
+    @property
+    def duration_in_seconds(self) -> float:
+        return self.duration_ns / 1_000_000_000
+
+    duration = duration_in_seconds
+
+    def lap_times_ns(self):
+        for start, end in self.get_laps():
+            yield end - start
+
+    def lap_times(self):
+        for lap_ns in self.lap_times_ns():
+            yield timedelta(microseconds=lap_ns / 1000)
+
+    def to_wall_clock(self, stamp_ns: int) -> datetime:
+        """
+        Converts one of this timer's timestamps into an (approximate) UTC datetime.
+        """
+        seconds, remainder_ns = divmod(stamp_ns + self._wall_offset_ns, 1_000_000_000)
+        return datetime.fromtimestamp(seconds, tz=timezone.utc) + timedelta(
+            microseconds=remainder_ns // 1000
+        )
+
+    def wall_clock_stamps(self):
+        for stamp in self.time_stamps:
+            yield self.to_wall_clock(stamp)
+
+
+_CALIBRATION_TARGET_NS = 200_000_000
+"""
+`bench` picks the smallest inner loop count that takes at least this long. Same as `timeit.autorange`.
+"""
+
+
+class BenchResult(object):
+    """
+    Timings from `bench`. Every sample is the mean time of one call, in nanoseconds,
+    averaged over `number` calls; there is one sample per repeat.
+    """
+
+    def __init__(self, name: str, number: int, samples_ns: typing.Sequence[float]):
+        self.name = name
+        self.number = number
+        self.samples_ns = list(samples_ns)
+
+    @property
+    def repeat(self) -> int:
+        return len(self.samples_ns)
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.samples_ns)
+
+    @property
+    def stdev(self) -> float:
+        return statistics.stdev(self.samples_ns) if self.repeat > 1 else 0.0
+
+    @property
+    def min(self) -> float:
+        return min(self.samples_ns)
+
+    @property
+    def max(self) -> float:
+        return max(self.samples_ns)
+
+    def percentile(self, percent: float) -> float:
+        if self.repeat == 1:
+            return self.samples_ns[0]
+        # quantiles() with n=1000 gives 999 cut points; index by tenths of a percent.
+        cut = round(percent * 10)
+        if cut <= 0:
+            return self.min
+        if cut >= 1000:
+            return self.max
+        return statistics.quantiles(self.samples_ns, n=1000, method="inclusive")[cut - 1]
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p90(self) -> float:
+        return self.percentile(90)
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(99)
+
+    @property
+    def outliers(self) -> list[float]:
+        """
+        Samples outside of Tukey's fences (1.5 IQR beyond the quartiles).
+        Usually a sign that something else on the machine got in the way.
+        """
+        if self.repeat < 4:
+            return []
+        q1, _, q3 = statistics.quantiles(self.samples_ns, n=4, method="inclusive")
+        fence = 1.5 * (q3 - q1)
+        return [s for s in self.samples_ns if s < q1 - fence or s > q3 + fence]
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        return {
+            "name": self.name,
+            "number": self.number,
+            "samples_ns": self.samples_ns,
+            "mean": self.mean,
+            "stdev": self.stdev,
+            "p50": self.p50,
+            "p90": self.p90,
+            "p99": self.p99,
+            "outliers": len(self.outliers),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, typing.Any]) -> "BenchResult":
+        return cls(data["name"], data["number"], data["samples_ns"])
+
+    def save_baseline(self, file_path: str) -> None:
+        """
+        Saves this result into a JSON file of baselines, keyed by name.
+        Other baselines already in the file are kept.
+        """
+        baselines = read_utf8_json_data(file_path) if os.path.exists(file_path) else {}
+        baselines[self.name] = self.to_dict()
+        write_utf8_json_data(file_path, baselines, sort_keys=True)
+
+    def compare_to_baseline(
+        self, baseline: "BenchResult | str", threshold: float = 0.1
+    ) -> "BenchComparison":
+        """
+        Compares against a `BenchResult`, or the baseline of the same name in a JSON file
+        written by `save_baseline`.
+        """
+        if isinstance(baseline, str):
+            baseline = BenchResult.from_dict(read_utf8_json_data(baseline)[self.name])
+        return BenchComparison(baseline, self, threshold)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}({self.name!r}, number={self.number}, repeat={self.repeat}, "
+            f"mean={self.mean:.1f}ns, stdev={self.stdev:.1f}ns)"
+        )
+
+
+class BenchComparison(object):
+    """
+    A baseline and a current `BenchResult`. Compared by median, since that's the statistic
+    least bothered by the odd outlier.
+    """
+
+    def __init__(self, baseline: BenchResult, current: BenchResult, threshold: float):
+        self.baseline = baseline
+        self.current = current
+        self.threshold = threshold
+
+    @property
+    def ratio(self) -> float:
+        """
+        Current median over baseline median. Above 1 means slower.
+        """
+        return self.current.p50 / self.baseline.p50
+
+    @property
+    def regressed(self) -> bool:
+        return self.ratio > 1 + self.threshold
+
+    @property
+    def improved(self) -> bool:
+        return self.ratio < 1 - self.threshold
+
+    def __bool__(self) -> bool:
+        # Truthy when things are fine, so `assert result.compare_to_baseline(path)` reads naturally.
+        return not self.regressed
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.current.name!r}, ratio={self.ratio:.3f})"
+
+
+def _time_loop(fn: typing.Callable[[], typing.Any], number: int) -> int:
+    t = HighResolutionTimer(start_now=True)
+    for _ in itertools.repeat(None, number):
+        fn()
+    t.stop()
+    return t.duration_ns
+
+
+def bench(
+    fn: typing.Callable[[], typing.Any],
+    *,
+    warmup: int = 1,
+    repeat: int = 5,
+    number: int | None = None,
+    disable_gc: bool = True,
+    name: str | None = None,
+) -> BenchResult:
+    """
+    Benchmarks a zero-argument callable. Use `functools.partial` (or a lambda) for arguments.
+
+    - `number` calls of `fn` make a sample. If `number` is `None`, it's calibrated the same way
+      as `timeit.autorange`: 1, 2, 5, 10, 20, 50... until a sample takes at least 0.2 seconds.
+    - `warmup` samples are taken and thrown away first.
+    - `repeat` samples are kept.
+    - `disable_gc` turns the garbage collector off while timing, also like `timeit`.
+    """
+    if repeat < 1:
+        raise ValueError("repeat must be at least one")
+
+    name = getattr(fn, "__qualname__", repr(fn)) if name is None else name
+    gc_was_enabled = gc.isenabled()
+    if disable_gc:
+        gc.disable()
+    try:
+        if number is None:
+            number = 1
+            for multiplier in itertools.cycle((2, 2.5, 2)):
+                if _time_loop(fn, number) >= _CALIBRATION_TARGET_NS:
+                    break
+                number = int(number * multiplier)
+
+        for _ in range(warmup):
+            _time_loop(fn, number)
+
+        samples = [_time_loop(fn, number) / number for _ in range(repeat)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return BenchResult(name, number, samples)
+
+
+class CoroutineTiming(object):
+    """
+    Accumulated timings for one or more awaited coroutines.
+
+    - `wall_ns` is the time from first resume to completion, including every `await`.
+    - `cpu_ns` is thread CPU time spent *inside* the coroutine, between suspensions.
+      That is the time it was blocking the event loop.
+    - `suspensions` is how many times it yielded back to the event loop.
+    """
+
+    __slots__ = ("calls", "wall_ns", "cpu_ns", "suspensions")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_ns = 0
+        self.cpu_ns = 0
+        self.suspensions = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(calls={self.calls}, wall_ns={self.wall_ns}, "
+            f"cpu_ns={self.cpu_ns}, suspensions={self.suspensions})"
+        )
+
+
+@types.coroutine
+def _drive_timed(awaitable, timing: CoroutineTiming):
+    # Steps the awaitable by hand, exactly like `await` would, but times each step.
+    # This is the only way to see the suspensions from the outside.
+    iterator = awaitable.__await__()
+    to_send: typing.Any = None
+    to_throw: BaseException | None = None
+    timing.calls += 1
+    wall_start = time.perf_counter_ns()
+    try:
+        while True:
+            cpu_start = time.thread_time_ns()
+            try:
+                if to_throw is None:
+                    yielded = iterator.send(to_send)
+                else:
+                    yielded = iterator.throw(to_throw)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                timing.cpu_ns += time.thread_time_ns() - cpu_start
+
+            timing.suspensions += 1
+            try:
+                to_send, to_throw = (yield yielded), None
+            except GeneratorExit:
+                iterator.close()
+                raise
+            except BaseException as ex:  # pylint: disable=broad-exception-caught
+                to_send, to_throw = None, ex
+    finally:
+        timing.wall_ns += time.perf_counter_ns() - wall_start
+
+
+class AsyncTimer(HighResolutionTimer, AbstractAsyncContextManager):
+    """
+    A `HighResolutionTimer` that can be used with `async with`, and can `measure` awaitables.
+
+    The `async with` block gives you wall time, like any other Timer.
+    Python gives no way to see when the *enclosing* coroutine is suspended, so CPU time and
+    suspension counts only cover awaitables passed through `measure`:
+    ```python
+    async with AsyncTimer() as t:
+        rows = await t.measure(fetch_rows())
+        await t.measure(write_rows(rows))
+    t.duration_ns, t.timing.cpu_ns, t.timing.suspensions
+    ```
+    """
+
+    def __init__(self, *, start_now: bool = False, histogram: LatencyHistogram | None = None):
+        self.timing = CoroutineTiming()
+        super().__init__(start_now=start_now, histogram=histogram)
+
+    async def measure(self, awaitable):
+        return await _drive_timed(awaitable, self.timing)
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, typ, val, tb):
+        self.stop()
+
+
+def async_timed(histogram: LatencyHistogram | None = None):
+    """
+    Decorator for coroutine functions that accumulates a `CoroutineTiming` over every call,
+    available as `.timing` on the decorated function.
+
+    If `histogram` is given, the wall time of every call is also recorded into it.
+    """
+
+    def deco_timed(f):
+        if not inspect.iscoroutinefunction(f):
+            raise TypeError(f"async_timed expects a coroutine function, not {f!r}")
+
+        timing = CoroutineTiming()
+
+        @functools.wraps(f)
+        async def f_timed(*args, **kwargs):
+            if histogram is None:
+                return await _drive_timed(f(*args, **kwargs), timing)
+
+            # `timing` is shared by concurrent calls, so each call is timed on its own.
+            wall_start = time.perf_counter_ns()
+            try:
+                return await _drive_timed(f(*args, **kwargs), timing)
+            finally:
+                histogram.record(time.perf_counter_ns() - wall_start)
+
+        f_timed.timing = timing  # type: ignore[attr-defined]
+        return f_timed
+
+    return deco_timed
+
+
+class EventLoopLagMonitor(AbstractAsyncContextManager):
+    """
+    Measures how late the event loop is at waking up a sleeping task, every `interval` seconds.
+
+    If something is blocking the loop, every other coroutine is late by (roughly) this much.
+    The lag is recorded into `histogram` in nanoseconds.
+    ```python
+    async with EventLoopLagMonitor() as monitor:
+        await serve_forever()
+    monitor.histogram.p99
+    ```
+    """
+
+    def __init__(self, interval: float = 0.05, histogram: LatencyHistogram | None = None):
+        self.interval = interval
+        self.histogram = LatencyHistogram() if histogram is None else histogram
+        self._task: asyncio.Task | None = None
+
+    async def _sample_forever(self) -> None:
+        interval_ns = int(self.interval * 1_000_000_000)
+        while True:
+            expected = time.perf_counter_ns() + interval_ns
+            await asyncio.sleep(self.interval)
+            self.histogram.record(max(0, time.perf_counter_ns() - expected))
+
+    def start(self) -> None:
+        """
+        Starts sampling on the running event loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._sample_forever())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, typ, val, tb):
+        await self.stop()
@@ -0,0 +1,102 @@
+"""
+### Legal
+SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
+
+SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
+"""
+
+import asyncio
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from stargazers.context import KeyboardInterruptManager, ShutdownCoordinator
+
+
+def test_keyboard_interrupt_is_deferred():
+    reached_end = False
+    with pytest.raises(KeyboardInterrupt):
+        with KeyboardInterruptManager():
+            signal.raise_signal(signal.SIGINT)
+            reached_end = True
+    assert reached_end
+    assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+
+
+def test_shutdown_drains_threads_and_cancels_executors():
+    finished = []
+    pool = ThreadPoolExecutor(max_workers=1)
+
+    with ShutdownCoordinator(deadline=5, reraise=False) as coordinator:
+        coordinator.add_executor(pool)
+
+        def worker():
+            with coordinator.in_flight():
+                coordinator.shutdown_event.wait(5)
+                time.sleep(0.05)
+                finished.append(True)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        # Keeps the pool busy until after draining, so `queued` is still queued.
+        blocker = pool.submit(time.sleep, 0.5)
+        queued = pool.submit(finished.append, False)
+        signal.raise_signal(signal.SIGTERM)
+
+    assert coordinator.shutting_down
+    assert finished == [True]
+    assert queued.cancelled()
+    blocker.result()
+    thread.join()
+
+
+def test_second_signal_skips_the_drain():
+    release = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=1)
+    coordinator = ShutdownCoordinator(deadline=5)
+
+    def worker():
+        with coordinator.in_flight():
+            release.wait(5)
+
+    thread = threading.Thread(target=worker)
+    start = time.monotonic()
+    with pytest.raises(KeyboardInterrupt):
+        with coordinator:
+            coordinator.add_executor(pool)
+            blocker = pool.submit(release.wait, 5)
+            queued = pool.submit(time.sleep, 0)
+            thread.start()
+            signal.raise_signal(signal.SIGINT)
+            # The second one arrives while draining.
+            threading.Timer(0.1, os.kill, (os.getpid(), signal.SIGINT)).start()
+
+    assert time.monotonic() - start < 2
+    assert queued.cancelled()
+    assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+
+    release.set()
+    blocker.result()
+    thread.join()
+
+
+def test_shutdown_cancels_asyncio_tasks():
+    coordinator = ShutdownCoordinator(deadline=0.05)
+
+    async def main():
+        event = coordinator.asyncio_event()
+        stuck = asyncio.create_task(asyncio.sleep(60))
+        coordinator.add_task(stuck)
+
+        threading.Timer(0.01, coordinator.request_shutdown).start()
+        await event.wait()
+        assert not await asyncio.to_thread(coordinator.drain)
+        with pytest.raises(asyncio.CancelledError):
+            await stuck
+
+    with coordinator.in_flight():
+        asyncio.run(main())
@@ -0,0 +1,326 @@
+"""
+### Legal
+SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
+
+SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from stargazers.decorators import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RateLimitExceeded,
+    TokenBucket,
+    circuit_breaker,
+    exponential_retry,
+    memoize,
+    micro_batch,
+    rate_limit,
+)
+
+
+class Flaky:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError(f"failure {self.calls}")
+        return self.calls
+
+
+def test_retry_sync_with_cap():
+    flaky = Flaky(2)
+    wrapped = exponential_retry(max_tries=3, base_delay=10, max_delay=0.01)(flaky)
+
+    assert wrapped() == 3
+    assert flaky.calls == 3
+
+
+def test_retry_async_with_hint():
+    flaky = Flaky(2)
+    hints = []
+
+    async def fetch():
+        return flaky()
+
+    def retry_after(ex):
+        hints.append(str(ex))
+        return 0
+
+    wrapped = exponential_retry(max_tries=5, jitter="full", retry_after=retry_after)(fetch)
+
+    assert asyncio.run(wrapped()) == 3
+    assert hints == ["failure 1", "failure 2"]
+
+
+def test_retry_deadline():
+    flaky = Flaky(10)
+    wrapped = exponential_retry(max_tries=10, base_delay=1, jitter="decorrelated", deadline=0.5)(
+        flaky
+    )
+
+    start = time.monotonic()
+    with pytest.raises(ConnectionError):
+        wrapped()
+    assert time.monotonic() - start < 0.5
+    assert flaky.calls == 1
+
+
+def test_circuit_breaker_opens_and_recovers():
+    flaky = Flaky(3)
+    wrapped = circuit_breaker(failure_threshold=2, recovery_timeout=0.05)(flaky)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            wrapped()
+    assert wrapped.circuit.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        wrapped()
+    assert flaky.calls == 2
+
+    time.sleep(0.06)
+    with pytest.raises(ConnectionError):
+        wrapped()  # Failed trial call, opens again.
+    assert wrapped.circuit.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    assert wrapped() == 4
+    assert wrapped.circuit.state == CircuitBreaker.CLOSED
+
+
+def test_retry_does_not_retry_open_circuit():
+    flaky = Flaky(100)
+    breaker = circuit_breaker(failure_threshold=1, recovery_timeout=60, name="test_shared")
+    first = exponential_retry(max_tries=5, base_delay=0)(breaker(flaky))
+    second = breaker(flaky)
+
+    with pytest.raises(CircuitOpenError):
+        first()
+    assert flaky.calls == 1
+    assert first.__wrapped__.circuit is second.circuit
+    with pytest.raises(CircuitOpenError):
+        second()
+
+
+def test_rate_limit():
+    calls = []
+    limited = rate_limit(100, capacity=2, block=False)(calls.append)
+
+    limited(1)
+    limited(2)
+    with pytest.raises(RateLimitExceeded) as info:
+        limited(3)
+    assert 0 < info.value.retry_in <= 0.01
+
+    @rate_limit(100, capacity=1)
+    async def blocking(i):
+        calls.append(i)
+
+    async def main():
+        await asyncio.gather(*(blocking(i) for i in range(5)))
+
+    start = time.monotonic()
+    asyncio.run(main())
+    assert time.monotonic() - start >= 0.03
+    assert len(calls) == 7
+
+
+def test_token_bucket_capacity():
+    with pytest.raises(ValueError):
+        TokenBucket(1, capacity=0.5)
+    with pytest.raises(ValueError):
+        rate_limit(1, capacity=0)(print)
+
+    bucket = TokenBucket(1, capacity=2)
+    with pytest.raises(ValueError):
+        bucket.try_acquire(3)
+    assert bucket.try_acquire(2) == 0
+
+
+def test_memoize_lru_and_ttl():
+    calls = []
+
+    @memoize(ttl=0.05, maxsize=2)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert [square(1), square(2), square(1)] == [1, 4, 1]
+    square(3)  # Evicts 2, the least recently used.
+    square(2)
+    assert calls == [1, 2, 3, 2]
+
+    time.sleep(0.06)
+    square(2)
+    info = square.cache_info()
+    assert calls == [1, 2, 3, 2, 2]
+    assert (info.hits, info.misses, info.evictions, info.expirations) == (1, 5, 2, 1)
+
+
+def test_memoize_max_bytes():
+    @memoize(maxsize=None, max_bytes=100, sizeof=len)
+    def blob(n):
+        return b"x" * n
+
+    for i in range(10):
+        blob(40 + i)
+    info = blob.cache_info()
+    assert info.currbytes <= 100
+    assert info.currsize == 2
+
+
+def test_memoize_single_flight_threads():
+    calls = []
+    release = threading.Event()
+
+    @memoize()
+    def slow(x):
+        calls.append(x)
+        release.wait(5)
+        return x
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow(7))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [7]
+    assert results == [7] * 8
+    assert slow.cache_info().coalesced == 7
+
+
+def test_memoize_abandoned_leader_threads():
+    calls = []
+    started = threading.Event()
+
+    @memoize()
+    def slow(x):
+        calls.append(x)
+        if len(calls) == 1:
+            started.set()
+            time.sleep(0.05)
+            raise SystemExit
+        return x
+
+    results = []
+    exits = []
+
+    def leader():
+        try:
+            slow(1)
+        except SystemExit as ex:
+            exits.append(ex)
+
+    leader_thread = threading.Thread(target=leader)
+    leader_thread.start()
+    started.wait(5)
+    threads = [threading.Thread(target=lambda: results.append(slow(1))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in [leader_thread, *threads]:
+        thread.join()
+
+    assert len(exits) == 1
+    assert results == [1] * 3
+    assert calls == [1, 1]
+
+
+def test_memoize_single_flight_async():
+    calls = []
+
+    @memoize()
+    async def lookup(x):
+        calls.append(x)
+        await asyncio.sleep(0.01)
+        if x < 0:
+            raise ValueError(x)
+        return x
+
+    async def main():
+        assert await asyncio.gather(*(lookup(3) for _ in range(5))) == [3] * 5
+        failures = await asyncio.gather(*(lookup(-1) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(ex, ValueError) for ex in failures)
+
+    asyncio.run(main())
+    assert calls == [3, -1]
+
+
+def test_memoize_cancelled_leader_async():
+    calls = []
+
+    @memoize()
+    async def lookup(x):
+        calls.append(x)
+        await asyncio.sleep(0.05)
+        return x
+
+    async def main():
+        leader = asyncio.create_task(lookup(1))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(lookup(1)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        assert await asyncio.gather(*waiters) == [1] * 3
+        assert leader.cancelled()
+        assert not any(waiter.cancelled() for waiter in waiters)
+
+    asyncio.run(main())
+    # The cancelled leader, then one waiter that took over.
+    assert calls == [1, 1]
+
+
+def test_micro_batch_threads():
+    batches = []
+
+    @micro_batch(max_size=10, max_wait=0.05)
+    def double_all(items):
+        batches.append(list(items))
+        return [i * 2 for i in items]
+
+    results = {}
+
+    def call(i):
+        results[i] = double_all(i)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(25)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {i: i * 2 for i in range(25)}
+    assert all(len(b) <= 10 for b in batches)
+    assert len(batches) < 25
+
+
+def test_micro_batch_async():
+    batches = []
+
+    @micro_batch(max_size=4, max_wait=0.01)
+    async def lookup(keys):
+        batches.append(list(keys))
+        if "bad" in keys:
+            return []
+        return [k.upper() for k in keys]
+
+    async def main():
+        assert await asyncio.gather(*(lookup(k) for k in "abcdef")) == list("ABCDEF")
+        with pytest.raises(ValueError):
+            await lookup("bad")
+
+    asyncio.run(main())
+    assert batches == [list("abcd"), list("ef"), ["bad"]]
@@ -0,0 +1,60 @@
+"""
+### Legal
+SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
+
+SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
+"""
+
+import math
+
+import hypothesis
+import hypothesis.strategies as st
+
+from stargazers.histogram import LatencyHistogram
+from stargazers.timer import HighResolutionTimer
+
+RELATIVE_ERROR = 2**-6
+
+
+@hypothesis.given(st.lists(st.integers(min_value=0, max_value=10**12), min_size=1))
+def test_percentiles_within_bucket_error(values):
+    hist = LatencyHistogram()
+    for v in values:
+        hist.record(v)
+
+    values.sort()
+    assert hist.count == len(values)
+    assert hist.min == values[0]
+    assert hist.max == values[-1]
+    for percent in (0, 50, 90, 99, 99.9, 100):
+        exact = values[max(0, math.ceil(len(values) * percent / 100) - 1)]
+        assert abs(hist.percentile(percent) - exact) <= exact * RELATIVE_ERROR + 1
+
+
+@hypothesis.given(
+    st.lists(st.integers(min_value=0, max_value=10**9)),
+    st.lists(st.integers(min_value=0, max_value=10**9)),
+)
+def test_merge_matches_single_histogram(left, right):
+    a, b, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for v in left:
+        a.record(v)
+        both.record(v)
+    for v in right:
+        b.record(v)
+        both.record(v)
+
+    merged = LatencyHistogram.merged([a, b])
+    assert merged.to_dict() == both.to_dict()
+    assert LatencyHistogram.from_dict(merged.to_dict()).summary() == both.summary()
+
+
+def test_timer_records_laps():
+    hist = LatencyHistogram()
+    t = HighResolutionTimer(start_now=True, histogram=hist)
+    t.lap()
+    t.lap()
+    t.stop()
+
+    assert hist.count == 3
+    assert hist.total == t.duration_ns
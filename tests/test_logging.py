@@ -0,0 +1,266 @@
+"""
+### Legal
+SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
+
+SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+
+import stargazers.logging as sg_logging
+from stargazers.logging import (
+    JsonFormatter,
+    LogRotation,
+    SamplingFilter,
+    dropped_log_records,
+    get_logger_for,
+    set_log_format,
+    set_log_level,
+)
+
+
+def _read_log_files(tmp_path):
+    return "".join(p.read_text() for p in sorted(tmp_path.glob("*.log")))
+
+
+def test_non_blocking_logger(tmp_path):
+    logger = get_logger_for(str(tmp_path / "non_blocking.py"), log_to_file=True, non_blocking=True)
+    for i in range(10):
+        logger.info("record %d", i)
+
+    sg_logging._get_queue_listener().queue.join()  # pylint: disable=protected-access
+
+    contents = _read_log_files(tmp_path)
+    for i in range(10):
+        assert f"record {i}" in contents
+
+
+def test_drop_on_overflow():
+    handler = sg_logging._DispatchQueueHandler(  # pylint: disable=protected-access
+        queue.Queue(1), [], drop_on_overflow=True
+    )
+    record = logging.LogRecord("drop", logging.INFO, __file__, 1, "dropped?", None, None)
+    before = dropped_log_records()
+    for _ in range(3):
+        handler.handle(record)
+    assert dropped_log_records() - before == 2
+
+
+def test_repeated_calls_are_idempotent(tmp_path):
+    file_name = str(tmp_path / "idempotent.py")
+    logger = get_logger_for(file_name, log_to_file=True)
+    handlers = list(logger.handlers)
+
+    for _ in range(5):
+        assert get_logger_for(file_name, log_to_file=True) is logger
+    assert logger.handlers == handlers
+    assert len(list(tmp_path.glob("*.log"))) == 1
+
+    # Different arguments swap handlers instead of piling more on.
+    get_logger_for(file_name)
+    assert len(logger.handlers) == 1
+
+    other = get_logger_for(str(tmp_path / "other.py"))
+    assert other.handlers == logger.handlers
+
+
+def test_swapped_handlers_are_closed(tmp_path):
+    file_name = str(tmp_path / "swapped.py")
+    logger = get_logger_for(file_name, log_to_file=True)
+    file_handler = next(h for h in logger.handlers if isinstance(h, logging.FileHandler))
+    assert file_handler.stream is not None
+
+    get_logger_for(file_name)
+    assert file_handler.stream is None
+
+    logger = get_logger_for(file_name, log_to_file=True, non_blocking=True)
+    logger.info("queued")
+    (queue_handler,) = logger.handlers
+    file_handler = next(h for h in queue_handler.targets if isinstance(h, logging.FileHandler))
+
+    get_logger_for(file_name)
+    listener = sg_logging._get_queue_listener()  # pylint: disable=protected-access
+    listener.queue.join()
+    assert file_handler.stream is None
+    assert "queued" in _read_log_files(tmp_path)
+
+
+def test_runtime_reconfiguration(tmp_path):
+    file_name = str(tmp_path / "reconfigured.py")
+    logger = get_logger_for(file_name, log_to_file=True, debug_config=False)
+    handlers = list(logger.handlers)
+
+    set_log_level(logging.WARNING, file_name)
+    assert get_logger_for(file_name, log_to_file=True, debug_config=False).level == logging.WARNING
+    logger.info("filtered")
+
+    set_log_format("RECONFIGURED {message}")
+    logger.warning("kept")
+    assert logger.handlers == handlers
+    for handler in handlers:
+        handler.flush()
+    assert _read_log_files(tmp_path) == "RECONFIGURED kept\n"
+
+
+def test_structured_logger(tmp_path):
+    file_name = str(tmp_path / "structured.py")
+    logger = get_logger_for(
+        file_name,
+        log_to_file=True,
+        structured=True,
+        json_fields=("asctime", "levelname", "lineno", "message"),
+    )
+    logger.info("hello %s", "json")
+    try:
+        raise ValueError("oops")
+    except ValueError:
+        logger.exception("failed")
+    for handler in logger.handlers:
+        handler.flush()
+
+    lines = _read_log_files(tmp_path).splitlines()
+    assert "," in lines[0] and ", " not in lines[0]
+
+    first, second = (json.loads(line) for line in lines)
+    assert list(first) == ["asctime", "levelname", "lineno", "message"]
+    assert first["message"] == "hello json"
+    assert first["levelname"] == "INFO"
+    assert "ValueError: oops" in second["exc_info"]
+
+
+def test_json_formatter_caches_timestamps():
+    formatter = JsonFormatter(("asctime", "message"))
+    record = logging.LogRecord("cached", logging.INFO, __file__, 1, "%d", (1,), None)
+    first = formatter.formatTime(record)
+
+    record.msecs = 999.0
+    assert formatter.formatTime(record) == f"{first[:-3]}999"
+    assert formatter.format(record) == f'{{"asctime":"{first[:-3]}999","message":"1"}}'
+
+
+def test_rotation_compresses_and_prunes(tmp_path):
+    logger = get_logger_for(
+        str(tmp_path / "rotating.py"),
+        log_to_file=True,
+        debug_config=False,
+        rotation=LogRotation(max_bytes=200, max_segments=2),
+    )
+    for i in range(100):
+        logger.info("rotating record %d", i)
+
+    # Queue a no-op behind the compression jobs to wait for them.
+    executor = sg_logging._get_compression_executor()  # pylint: disable=protected-access
+    executor.submit(lambda: None).result()
+
+    segments = sorted(tmp_path.glob("*.log.*"))
+    assert len(segments) == 2
+    assert all(p.suffix == ".gz" for p in segments)
+    newest = gzip.decompress(segments[-1].read_bytes()).decode()
+    assert "rotating record" in newest
+    assert "rotating record 99" in _read_log_files(tmp_path) or "rotating record 99" in newest
+
+
+_EXIT_SCRIPT = """
+import sys
+from stargazers.logging import LogRotation, get_logger_for
+
+logger = get_logger_for(
+    sys.argv[1],
+    log_to_file=True,
+    non_blocking=True,
+    debug_config=False,
+    rotation=LogRotation(max_bytes=2000, max_segments=3),
+)
+for i in range(2000):
+    logger.info("record %d", i)
+"""
+
+
+def test_rotation_while_draining_at_exit(tmp_path):
+    # The listener drains after the compression executor has shut down.
+    result = subprocess.run(
+        [sys.executable, "-c", _EXIT_SCRIPT, str(tmp_path / "exiting.py")],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        check=True,
+        timeout=60,
+    )
+
+    assert "Logging error" not in result.stderr
+    segments = sorted(tmp_path.glob("*.log.*"))
+    assert len(segments) == 3
+    assert all(p.suffix == ".gz" for p in segments)
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_sampling_filter():
+    logger = logging.getLogger("sampled")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    sampler = SamplingFilter(every_n=10, summary_interval=3600)
+    logger.addFilter(sampler)
+
+    for i in range(100):
+        logger.debug("hot loop %d", i)
+    logger.warning("always kept")
+
+    messages = [r.getMessage() for r in handler.records]
+    assert messages == [f"hot loop {i}" for i in range(0, 100, 10)] + ["always kept"]
+    assert sum(sampler.suppressed_counts().values()) == 90
+
+
+def test_rate_limit_and_summary():
+    logger = logging.getLogger("rate_limited")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    logger.addFilter(SamplingFilter(per_second=5, summary_interval=0))
+
+    for _ in range(50):
+        logger.info("burst")
+
+    kept = [r for r in handler.records if not getattr(r, "sampling_summary", False)]
+    summaries = [r for r in handler.records if getattr(r, "sampling_summary", False)]
+    assert 5 <= len(kept) <= 10  # The burst may straddle a second boundary.
+    assert summaries
+    assert "suppressed" in summaries[0].getMessage()
+
+
+def test_sampling_summary_flush():
+    logger = logging.getLogger("flushed")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    sampler = SamplingFilter(every_n=10, summary_interval=3600)
+    logger.addFilter(sampler)
+
+    for _ in range(25):
+        logger.debug("quiet afterwards")
+    assert len(handler.records) == 3
+
+    sampler.flush()
+    summary = handler.records[-1]
+    assert getattr(summary, "sampling_summary", False)
+    assert "suppressed 22 records" in summary.getMessage()
+
+    sampler.flush()
+    assert len(handler.records) == 4
@@ -0,0 +1,134 @@
+"""
+### Legal
+SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
+
+SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
+"""
+
+import socket
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from stargazers.metrics import (
+    MetricsRegistry,
+    PrometheusFileExporter,
+    PrometheusHTTPExporter,
+    StatsdExporter,
+)
+
+THREADS = 8
+INCREMENTS = 1000
+
+
+def test_counters_and_histograms_merge_across_threads():
+    registry = MetricsRegistry()
+    hits = registry.counter("hits_total")
+    latency = registry.histogram("latency_seconds")
+
+    def work():
+        for _ in range(INCREMENTS):
+            hits.inc()
+            latency.observe_ns(1000)
+
+    threads = [threading.Thread(target=work) for _ in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert hits.value == THREADS * INCREMENTS
+    assert latency.value.count == THREADS * INCREMENTS
+    # Dead threads get folded on scrape, and the total doesn't change.
+    assert hits.value == THREADS * INCREMENTS
+    assert registry.counter("hits_total") is hits
+
+    with pytest.raises(ValueError):
+        registry.gauge("hits_total")
+
+
+def test_prometheus_exporters(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter("batches_total", "Batches processed.").inc(3)
+    registry.gauge("queue_depth").set(7)
+    with registry.histogram("batch_seconds").time():
+        pass
+
+    text = registry.render_prometheus()
+    assert "# HELP batches_total Batches processed.\n" in text
+    assert "batches_total 3\n" in text
+    assert "queue_depth 7\n" in text
+    assert 'batch_seconds{quantile="0.99"}' in text
+    assert "batch_seconds_count 1\n" in text
+
+    out = tmp_path / "metrics.prom"
+    file_exporter = PrometheusFileExporter(registry, str(out), interval=60)
+    file_exporter.start()
+    file_exporter.stop()
+    assert out.read_text() == text
+
+    http_exporter = PrometheusHTTPExporter(registry, port=0)
+    http_exporter.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{http_exporter.port}/metrics") as response:
+            assert response.read().decode() == text
+    finally:
+        http_exporter.stop()
+
+
+def test_statsd_exporter():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(5)
+
+    registry = MetricsRegistry()
+    retries = registry.counter("retries_total")
+    retries.inc(2)
+
+    exporter = StatsdExporter(registry, port=receiver.getsockname()[1], prefix="app.")
+    try:
+        exporter.flush()
+        assert receiver.recv(4096) == b"app.retries_total:2|c"
+        retries.inc()
+        exporter.flush()
+        assert receiver.recv(4096) == b"app.retries_total:1|c"
+
+        registry.gauge("balance").dec(5)
+        exporter.flush()
+        assert receiver.recv(4096) == (b"app.retries_total:0|c\napp.balance:0|g\napp.balance:-5|g")
+    finally:
+        exporter.stop()
+        receiver.close()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_exporter_survives_broken_gauge(tmp_path, monkeypatch):
+    reported = []
+    monkeypatch.setattr(threading, "excepthook", reported.append)
+
+    registry = MetricsRegistry()
+    broken = registry.gauge("broken")
+    broken.set_function(lambda: 1 / 0)
+
+    out = tmp_path / "metrics.prom"
+    exporter = PrometheusFileExporter(registry, str(out), interval=0.01)
+    exporter.start()
+    try:
+        _wait_for(lambda: reported)
+        assert exporter.is_alive()
+        assert reported[0].exc_type is ZeroDivisionError
+        assert reported[0].thread is exporter
+
+        broken.set_function(lambda: 2)
+        _wait_for(out.exists)
+    finally:
+        exporter.stop()
+    assert "broken 2\n" in out.read_text()
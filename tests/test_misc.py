@@ -5,9 +5,21 @@ SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
 SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
 """
 
+import threading
+
 import pytest
 
-from stargazers import InvariantViolation, invariant
+from stargazers import (
+    InvariantPolicy,
+    InvariantViolation,
+    count_invariants,
+    dump_many,
+    dump_to_dict,
+    invariant,
+    invariant_counts,
+    reset_invariant_policy,
+    set_invariant_policy,
+)
 
 
 def test_invariant():
@@ -18,3 +30,115 @@ def test_invariant():
     with pytest.raises(InvariantViolation):
         invariant(object(), lambda x: x is None)
     assert True
+
+
+def test_invariant_message():
+    with pytest.raises(InvariantViolation, match="positional"):
+        invariant(False, "positional")
+    with pytest.raises(InvariantViolation, match="keyword"):
+        invariant(False, msg="keyword")
+
+
+def test_invariant_register():
+    class Positive(int):
+        pass
+
+    @invariant.register(Positive)
+    def _(obj, msg=None):
+        return invariant(obj > 0, msg)
+
+    assert invariant.dispatch(Positive) is invariant.registry[Positive]
+    assert invariant(Positive(1))
+    with pytest.raises(InvariantViolation, match="not positive"):
+        invariant(Positive(-1), "not positive")
+
+
+def test_invariant_policies():
+    try:
+        set_invariant_policy(InvariantPolicy.DISABLED)
+        assert invariant(False)
+
+        set_invariant_policy(InvariantPolicy.ALWAYS, module=__name__)
+        with pytest.raises(InvariantViolation):
+            invariant(False)
+
+        set_invariant_policy(InvariantPolicy.SAMPLED, sample_every=10, module=__name__)
+        raised = 0
+        for _ in range(100):
+            try:
+                invariant(False)
+            except InvariantViolation:
+                raised += 1
+        assert raised == 10
+
+        with pytest.raises(ValueError):
+            set_invariant_policy("sometimes")
+    finally:
+        reset_invariant_policy()
+
+    with pytest.raises(InvariantViolation):
+        invariant(False)
+
+
+def test_invariant_counts():
+    try:
+        count_invariants()
+        for i in range(5):
+            try:
+                invariant(i % 2 == 0)
+            except InvariantViolation:
+                pass
+    finally:
+        count_invariants(False)
+
+    counts = [c for (file_name, _), c in invariant_counts().items() if file_name == __file__]
+    assert (5, 2) in counts
+
+
+class _Point(object):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def test_invariant_sampling_threads():
+    def work():
+        for _ in range(1000):
+            try:
+                invariant(False)
+            except InvariantViolation:
+                pass
+
+    try:
+        set_invariant_policy(InvariantPolicy.SAMPLED, sample_every=10, module=__name__)
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        reset_invariant_policy()
+
+    # Exactly 1 in 10, however the threads interleaved.
+    assert (800, 800) in invariant_counts().values()
+
+
+def test_dump_to_dict():
+    assert dump_to_dict(_Point(1, 2), ["x", "y"]) == {"x": 1, "y": 2}
+    assert dump_to_dict(_Point(1, 2), ["x"]) == {"x": 1}
+
+
+def test_dump_many():
+    points = [_Point(i, -i) for i in range(3)]
+
+    rows = dump_many(points, ["x", "y"])
+    assert next(rows) == {"x": 0, "y": 0}
+    assert list(rows) == [{"x": 1, "y": -1}, {"x": 2, "y": -2}]
+    assert list(dump_many(points, ["y"])) == [{"y": 0}, {"y": -1}, {"y": -2}]
+
+    assert dump_many(points, ["x", "y"], layout="columns") == {"x": [0, 1, 2], "y": [0, -1, -2]}
+    assert dump_many(iter(points), ("x",), layout="columns") == {"x": [0, 1, 2]}
+    assert dump_many([], ["x"], layout="columns") == {"x": []}
+
+    with pytest.raises(ValueError):
+        dump_many(points, ["x"], layout="diagonal")
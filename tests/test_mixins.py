@@ -0,0 +1,67 @@
+"""
+### Legal
+SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
+
+SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
+"""
+
+import copy
+import pickle
+import threading
+
+from stargazers.mixins import DecimalCounterMixin, HexCounterMixin
+
+
+def _unbounded_fibonacci(n, modulus):
+    a, b = 1, 2
+    for _ in range(n):
+        yield a % modulus
+        a, b = b, a + b
+
+
+def test_counters_match_unbounded():
+    decimal, hexadecimal = DecimalCounterMixin(), HexCounterMixin()
+    assert [decimal.counter for _ in range(500)] == list(_unbounded_fibonacci(500, 1000))
+    assert [hexadecimal.counter for _ in range(500)] == list(_unbounded_fibonacci(500, 0xFFFF))
+    # The state stays small however long the counter runs.
+    for _ in range(10_000):
+        _ = hexadecimal.counter
+    assert len(pickle.dumps(hexadecimal)) < 200
+
+
+def test_counter_block():
+    expected = list(_unbounded_fibonacci(300, 0xFFFF))
+    counter = HexCounterMixin()
+    assert counter.counter == expected[0]
+    block = counter.counter_block(200)
+    assert block.tolist() == expected[1:201]
+    assert [counter.counter for _ in range(99)] == expected[201:]
+    assert len(counter.counter_block(0)) == 0
+
+
+def test_counters_pickle_and_copy():
+    expected = list(_unbounded_fibonacci(20, 1000))
+    counter = DecimalCounterMixin()
+    assert [counter.counter for _ in range(10)] == expected[:10]
+
+    for clone in (pickle.loads(pickle.dumps(counter)), copy.deepcopy(counter), copy.copy(counter)):
+        assert [clone.counter for _ in range(10)] == expected[10:]
+    assert [counter.counter for _ in range(10)] == expected[10:]
+
+
+def test_counter_threads():
+    counter = DecimalCounterMixin()
+    seen = []
+
+    def work():
+        values = [counter.counter for _ in range(1000)]
+        values.extend(counter.counter_block(1000))
+        seen.extend(values)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(seen) == sorted(_unbounded_fibonacci(8000, 1000))
@@ -0,0 +1,57 @@
+"""
+### Legal
+SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
+
+SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
+"""
+
+import asyncio
+from time import sleep
+
+from stargazers.profiler import SpanProfiler
+
+SPAN_SLEEP = 0.01
+
+
+def test_nested_spans():
+    profiler = SpanProfiler()
+
+    @profiler.profile("outer")
+    def outer():
+        for _ in range(2):
+            with profiler.span("inner"):
+                sleep(SPAN_SLEEP)
+
+    outer()
+    outer()
+
+    stats = profiler.stats()
+    assert set(stats) == {("outer",), ("outer", "inner")}
+    assert stats[("outer",)].calls == 2
+    assert stats[("outer", "inner")].calls == 4
+    assert stats[("outer",)].child_ns == stats[("outer", "inner")].total_ns
+    assert stats[("outer", "inner")].total_ns >= 4 * SPAN_SLEEP * 1e9
+
+
+def test_spans_per_task(tmp_path):
+    profiler = SpanProfiler()
+
+    @profiler.profile()
+    async def leaf():
+        await asyncio.sleep(SPAN_SLEEP)
+
+    async def main():
+        with profiler.span("root"):
+            await asyncio.gather(leaf(), leaf())
+
+    asyncio.run(main())
+
+    stats = profiler.stats()
+    assert stats[("root", leaf.__qualname__)].calls == 2
+
+    out = tmp_path / "spans.folded"
+    profiler.dump_folded(str(out))
+    for line in out.read_text().splitlines():
+        path, self_us = line.rsplit(" ", 1)
+        assert path.startswith("root")
+        assert int(self_us) > 0
@@ -5,11 +5,22 @@ SPDX-FileCopyright © 2025 Robert Ferguson <rmferguson@pm.me>
 SPDX-License-Identifier: [MIT](https://spdx.org/licenses/MIT.html)
 """
 
+import asyncio
 from time import sleep
 
 import pytest
 
-from stargazers.timer import Timer, TimerError
+from stargazers.histogram import LatencyHistogram
+from stargazers.timer import (
+    AsyncTimer,
+    BenchResult,
+    EventLoopLagMonitor,
+    HighResolutionTimer,
+    Timer,
+    TimerError,
+    async_timed,
+    bench,
+)
 
 TIMER_STATIC_DURATION = 0.5
 
@@ -18,13 +29,124 @@ def test_timer_functionality():
     with Timer() as t:
         sleep(TIMER_STATIC_DURATION)
 
-    assert not list(t.get_laps())
+    # `start(); stop()` is one lap.
+    assert len(list(t.get_laps())) == 1
     assert t.start_time
     assert t.stop_time
 
 
+def test_laps_match_histogram():
+    hist = LatencyHistogram()
+    t = Timer(histogram=hist)
+    t.start()
+    t.lap()
+    t.lap()
+    t.stop()
+
+    assert t.lap_count == 3
+    assert len(list(t.get_laps())) == hist.count == 3
+
+
 def test_bad_stop():
     with pytest.raises(TimerError):
         t = Timer()
         t.stop()
     assert True
+
+
+def test_high_resolution_timer():
+    t = HighResolutionTimer(start_now=True)
+    for _ in range(3):
+        t.lap()
+    t.stop()
+
+    assert isinstance(t.duration_ns, int)
+    assert t.duration_ns >= 0
+    assert t.time_stamps.typecode == "q"
+    assert t.time_stamps[0] == t.start_time
+    assert t.time_stamps[-1] == t.stop_time
+    laps = list(t.lap_times_ns())
+    assert len(laps) == 4
+    assert laps[-1] == t.stop_time - t.time_stamps[-2]
+    assert sum(laps) == t.duration_ns
+    assert all(isinstance(lap, int) for lap in t.lap_times_ns())
+
+    wall = list(t.wall_clock_stamps())
+    assert wall == sorted(wall)
+    assert abs((wall[0] - Timer.utcnow()).total_seconds()) < 5
+
+
+def test_bench_and_baseline(tmp_path):
+    result = bench(lambda: sum(range(100)), warmup=0, repeat=8, number=1000)
+
+    assert result.number == 1000
+    assert result.repeat == 8
+    assert result.min <= result.p50 <= result.max
+    assert result.stdev >= 0
+
+    baseline = tmp_path / "bench.json"
+    result.save_baseline(str(baseline))
+    assert result.compare_to_baseline(str(baseline))
+
+    slower = BenchResult(result.name, result.number, [s * 2 for s in result.samples_ns])
+    assert slower.compare_to_baseline(str(baseline)).regressed
+
+
+def test_bench_outliers():
+    result = BenchResult("outliers", 1, [10.0] * 9 + [1000.0])
+    assert result.outliers == [1000.0]
+
+
+def test_async_timing():
+    hist = LatencyHistogram()
+
+    @async_timed(histogram=hist)
+    async def napper():
+        for _ in range(3):
+            await asyncio.sleep(TIMER_STATIC_DURATION / 10)
+        return "done"
+
+    async def main():
+        async with AsyncTimer() as t:
+            assert await t.measure(napper()) == "done"
+        return t
+
+    t = asyncio.run(main())
+
+    assert napper.timing.calls == 1
+    assert napper.timing.suspensions == 3
+    assert napper.timing.cpu_ns < napper.timing.wall_ns
+    assert hist.count == 1
+    assert t.timing.suspensions == 3
+    assert t.duration_ns >= t.timing.wall_ns
+
+
+def test_async_timed_concurrent_calls():
+    hist = LatencyHistogram()
+
+    @async_timed(histogram=hist)
+    async def napper():
+        await asyncio.sleep(0.1)
+
+    async def main():
+        await asyncio.gather(*(napper() for _ in range(5)))
+
+    asyncio.run(main())
+
+    assert napper.timing.calls == 5
+    assert hist.count == 5
+    # Each call is only its own ~100ms, even though they overlapped.
+    assert hist.max < 200_000_000
+
+
+def test_event_loop_lag_monitor():
+    async def main():
+        async with EventLoopLagMonitor(interval=0.001) as monitor:
+            await asyncio.sleep(0.01)
+            sleep(0.05)  # Blocks the loop on purpose.
+            await asyncio.sleep(0.01)
+        return monitor
+
+    monitor = asyncio.run(main())
+    assert monitor.histogram.count > 1
+    assert monitor.histogram.max >= 0.04 * 1e9